@@ -0,0 +1,193 @@
+# benchmarks/generate.py
+
+"""
+Генератор синтетических BOM в формате CycloneDX JSON и соответствующих им xlsx-таблиц.
+Состав компонентов задается долями типов PURL, часть компонентов получает ссылку
+на архив дистрибутива на локальном сервере (benchmarks/registry.py).
+Одинаковые параметры и seed дают одинаковые файлы.
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import uuid
+
+from openpyxl import Workbook
+
+DEFAULT_MIX = "npm=40,nuget=25,maven=15,github=10,generic=10"
+COLUMNS = ["Component", "Version", "Type", "BOM Reference", "PURL", "externalReferences", "attack_surface", "security_function"]
+
+
+def parse_mix(text):
+    """
+    Разбирает строку вида "npm=40,nuget=25" в словарь тип -> вес.
+    """
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def _package(purl_type, index, version):
+    """
+    Возвращает (имя, purl, ссылка на страницу пакета) для компонента заданного типа.
+    """
+    if purl_type == "npm":
+        name = f"bench-pkg-{index}"
+        return name, f"pkg:npm/{name}@{version}", f"https://www.npmjs.com/package/{name}"
+    if purl_type == "nuget":
+        name = f"Bench.Package{index}"
+        return name, f"pkg:nuget/{name}@{version}", f"https://www.nuget.org/packages/{name}/{version}"
+    if purl_type == "maven":
+        name = f"bench-artifact-{index}"
+        return name, f"pkg:maven/org.example.bench/{name}@{version}", f"https://mvnrepository.com/artifact/org.example.bench/{name}"
+    if purl_type == "github":
+        name = f"bench-repo-{index}"
+        return name, f"pkg:github/bench-org/{name}@{version}", f"https://github.com/bench-org/{name}"
+    name = f"bench-lib-{index}"
+    return name, f"pkg:generic/{name}@{version}", f"https://example.org/{name}"
+
+
+def generate_components(count, mix=None, dist_ratio=0.1, unique_ratio=0.5, base_url="http://127.0.0.1:8765", seed=1,
+                        local_pages=False):
+    """
+    Выдает словари компонентов с полями, общими для BOM и таблицы.
+    unique_ratio - доля различных пакетов: остальные строки повторяют уже встречавшиеся
+    пакеты, как в реальных выгрузках по нескольким проектам.
+    local_pages - ссылки website ведут на страницы локального сервера (для замера --verify-urls).
+    """
+    rng = random.Random(seed)
+    mix = mix or parse_mix(DEFAULT_MIX)
+    types = list(mix)
+    weights = [mix[name] for name in types]
+    pool = max(1, int(count * unique_ratio))
+    for _ in range(count):
+        index = rng.randrange(pool)
+        purl_type = rng.choices(types, weights)[0]
+        version = f"{index % 7}.{index % 13}.{index % 5}"
+        name, purl, website = _package(purl_type, index, version)
+        if local_pages:
+            website = f"{base_url}/pages/{purl_type}/{name}"
+        distribution = None
+        if rng.random() < dist_ratio:
+            distribution = f"{base_url}/{purl_type}/{name}-{version}.tgz"
+        yield {
+            "bom-ref": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "name": name,
+            "version": version,
+            "purl": purl,
+            "website": website,
+            "distribution": distribution,
+            "attack_surface": rng.choice(["yes", "no", None]),
+            "security_function": rng.choice(["yes", "no", None]),
+        }
+
+
+def _bom_component(item):
+    component = {
+        "type": "library",
+        "bom-ref": item["bom-ref"],
+        "name": item["name"],
+        "version": item["version"],
+        "purl": item["purl"],
+        "externalReferences": [{"type": "website", "url": item["website"]}],
+        "properties": [
+            {"name": "GOST:attack_surface", "value": item["attack_surface"] or "undefined"},
+            {"name": "GOST:security_function", "value": item["security_function"] or "undefined"}
+        ]
+    }
+    if item["distribution"]:
+        component["externalReferences"].append({"type": "distribution", "url": item["distribution"]})
+    return component
+
+
+def write_bom(path, components, seed=1):
+    """
+    Записывает BOM потоково, по одному компоненту, чтобы генерация 1M компонентов
+    не требовала держать документ в памяти. Граф зависимостей - цепочка bom-ref.
+    """
+    refs = []
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"bomFormat": "CycloneDX", "specVersion": "1.6", "version": 1, ')
+        f.write(f'"serialNumber": "urn:uuid:{uuid.UUID(int=random.Random(seed).getrandbits(128), version=4)}", ')
+        f.write('"components": [')
+        for index, item in enumerate(components):
+            if index:
+                f.write(",")
+            f.write(json.dumps(_bom_component(item), ensure_ascii=False))
+            refs.append(item["bom-ref"])
+        f.write('], "dependencies": [')
+        for index, ref in enumerate(refs):
+            if index:
+                f.write(",")
+            depends_on = [refs[index + 1]] if index + 1 < len(refs) else []
+            f.write(json.dumps({"ref": ref, "dependsOn": depends_on}))
+        f.write("]}")
+
+
+def write_xlsx(path, components):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(COLUMNS)
+    for item in components:
+        references = item["website"]
+        if item["distribution"]:
+            references += ", " + item["distribution"]
+        sheet.append([
+            item["name"], item["version"], "library", item["bom-ref"], item["purl"],
+            references, item["attack_surface"], item["security_function"]
+        ])
+    workbook.save(path)
+
+
+def write_csv(path, components, delimiter=","):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(COLUMNS)
+        for item in components:
+            references = item["website"]
+            if item["distribution"]:
+                references += ", " + item["distribution"]
+            writer.writerow([
+                item["name"], item["version"], "library", item["bom-ref"], item["purl"],
+                references, item["attack_surface"], item["security_function"]
+            ])
+
+
+def generate(count, bom_path=None, xlsx_path=None, **options):
+    """
+    Таблица пишется в формате по расширению xlsx_path: .csv, .tsv или xlsx.
+    """
+    if bom_path:
+        write_bom(bom_path, generate_components(count, **options), options.get("seed", 1))
+    if xlsx_path:
+        extension = os.path.splitext(xlsx_path)[1].lower()
+        if extension in (".csv", ".tsv"):
+            write_csv(xlsx_path, generate_components(count, **options), "\t" if extension == ".tsv" else ",")
+        else:
+            write_xlsx(xlsx_path, generate_components(count, **options))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерация синтетических BOM и xlsx-таблиц для замеров производительности")
+    parser.add_argument("-n", "--count", type=int, required=True, help="Число компонентов")
+    parser.add_argument("--json", help="Путь к выходному BOM (CycloneDX JSON)")
+    parser.add_argument("--xlsx", help="Путь к выходной таблице: .xlsx, .csv или .tsv")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Доли типов PURL (по умолчанию {DEFAULT_MIX})")
+    parser.add_argument("--dist-ratio", type=float, default=0.1, help="Доля компонентов со ссылкой на архив (по умолчанию 0.1)")
+    parser.add_argument("--unique-ratio", type=float, default=0.5, help="Доля различных пакетов (по умолчанию 0.5)")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8765", help="Адрес локального сервера архивов")
+    parser.add_argument("--seed", type=int, default=1, help="Начальное значение генератора случайных чисел")
+    parser.add_argument("--local-pages", action="store_true", help="Ссылки website на страницы локального сервера")
+    args = parser.parse_args()
+    if not args.json and not args.xlsx:
+        parser.error("нужно указать --json и/или --xlsx")
+    generate(args.count, args.json, args.xlsx, mix=parse_mix(args.mix), dist_ratio=args.dist_ratio,
+             unique_ratio=args.unique_ratio, base_url=args.base_url, seed=args.seed, local_pages=args.local_pages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# benchmarks/registry.py
+
+"""
+Локальный заменитель реестра пакетов для замеров: отдает по любому пути *.tgz / *.tar.gz
+архив tar.gz с package/package.json, LICENSE и данными заданного размера (или размера из диапазона,
+постоянного для пути).
+Поддерживает HEAD, ETag, Content-Length, докачку через Range и искусственную задержку ответа.
+По путям /pages/... отдает страницу пакета (для проверки ссылок --verify-urls), по путям
+/pages/missing/... и всем остальным - 404.
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import random
+import tarfile
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+# Размер данных архива по умолчанию: архивы реальных пакетов - от сотен КБ до нескольких МБ,
+# и на таких размерах заметна стоимость расчета хэша
+DEFAULT_SIZE = "256K-2M"
+UNITS = {"K": 1 << 10, "M": 1 << 20}
+
+
+def parse_size(text):
+    """
+    Размер данных архива: число байт с необязательным суффиксом K или M ("4096", "512K")
+    или диапазон "MIN-MAX" ("256K-2M"). Возвращает пару (наименьший, наибольший размер).
+    """
+    def size(value):
+        value = value.strip().upper()
+        multiplier = UNITS.get(value[-1:], 1)
+        return int(value[:-1] if value[-1:] in UNITS else value) * multiplier
+
+    low, _, high = text.partition("-")
+    low = size(low)
+    high = size(high) if high else low
+    if low < 0 or high < low:
+        raise ValueError(f"неверный размер архива: {text}")
+    return low, high
+
+
+class TarballStore:
+    """
+    Создает архивы по требованию и хранит последние из них в памяти.
+    Содержимое определяется путем, поэтому повторный запрос дает тот же файл.
+    """
+
+    def __init__(self, size=DEFAULT_SIZE, max_bytes=256 << 20):
+        if isinstance(size, str):
+            size = parse_size(size)
+        self.size = size if isinstance(size, tuple) else (size, size)
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        with self._lock:
+            data = self._items.get(path)
+            if data is not None:
+                self._items.move_to_end(path)
+                return data
+        data = self._build(path)
+        with self._lock:
+            if path not in self._items:
+                self._items[path] = data
+                self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                self._bytes -= len(self._items.popitem(last=False)[1])
+        return data
+
+    def _build(self, path):
+        base = path.rsplit("/", 1)[-1].replace(".tar.gz", "").replace(".tgz", "")
+        name, _, version = base.rpartition("-")
+        seed = int.from_bytes(hashlib.sha256(path.encode("utf-8")).digest()[:8], "big")
+        rng = random.Random(seed)
+        size = rng.randint(*self.size)
+        files = [
+            ("package/package.json", json.dumps({"name": name, "version": version, "license": "MIT"}).encode("utf-8")),
+            ("package/LICENSE", b"MIT License\n"),
+            # Случайные данные не сжимаются, поэтому размер архива близок к заданному
+            ("package/data.bin", rng.randbytes(size)),
+        ]
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w", format=tarfile.USTAR_FORMAT) as tar:
+            for file_name, content in files:
+                info = tarfile.TarInfo(file_name)
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+        return gzip.compress(buffer.getvalue(), compresslevel=1, mtime=0)
+
+
+def make_handler(store, latency=0.0):
+    class RegistryHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_HEAD(self):
+            self._respond(body=False)
+
+        def do_GET(self):
+            self._respond(body=True)
+
+        def _respond(self, body):
+            if latency:
+                time.sleep(latency)
+            path = self.path.split("?", 1)[0]
+            if path.startswith("/pages/") and not path.startswith("/pages/missing/"):
+                page = f"<html><body>{path}</body></html>".encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(page)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(page)
+                return
+            if not (path.endswith(".tgz") or path.endswith(".tar.gz")):
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            data = store.get(path)
+            start = 0
+            range_header = self.headers.get("Range", "")
+            if range_header.startswith("bytes=") and range_header[6:].rstrip("-").isdigit():
+                start = min(int(range_header[6:].rstrip("-")), len(data))
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Type", "application/gzip")
+            self.send_header("Content-Length", str(len(data) - start))
+            self.send_header("ETag", '"%s"' % hashlib.sha1(data).hexdigest())
+            self.send_header("Last-Modified", LAST_MODIFIED)
+            self.end_headers()
+            if body:
+                self.wfile.write(data[start:])
+
+    return RegistryHandler
+
+
+def start_server(host="127.0.0.1", port=0, latency=0.0, size=DEFAULT_SIZE):
+    """
+    Запускает сервер в фоновом потоке и возвращает его; адрес - server.server_address.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(TarballStore(size), latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный сервер архивов дистрибутивов для замеров производительности")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес (по умолчанию 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Порт (по умолчанию 8765)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа в секундах (по умолчанию 0)")
+    parser.add_argument("--size", type=parse_size, default=DEFAULT_SIZE,
+                        help=f"Размер данных в архиве: байты, 512K, 2M или диапазон MIN-MAX (по умолчанию {DEFAULT_SIZE})")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(TarballStore(args.size), args.latency))
+    server.daemon_threads = True
+    print(f"Сервер архивов: http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# benchmarks/run.py
+
+"""
+Замеры производительности json-to-xlsx и xlsx-to-json на синтетических данных.
+Для каждого размера генерируются BOM и таблица, запускается локальный сервер архивов,
+затем каждое преобразование выполняется отдельным процессом (время и пиковая память процесса).
+Время этапов xlsx-to-json берется из его отчета --metrics-json, этапы json-to-xlsx
+замеряются отдельным запуском stages.py. Результаты сохраняются в JSON для сравнения версий.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from generate import DEFAULT_MIX, generate, parse_mix
+from registry import DEFAULT_SIZE, parse_size, start_server
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+# Размер BOM для замера времени запуска: время почти целиком уходит на запуск и импорт модулей
+STARTUP_COMPONENTS = 10
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Замеры производительности конвертеров на синтетических BOM")
+    parser.add_argument("--sizes", default="1000,10000", help="Число компонентов через запятую (по умолчанию 1000,10000)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Доли типов PURL (по умолчанию {DEFAULT_MIX})")
+    parser.add_argument("--dist-ratio", type=float, default=0.1, help="Доля компонентов со ссылкой на архив (по умолчанию 0.1)")
+    parser.add_argument("--unique-ratio", type=float, default=0.5, help="Доля различных пакетов (по умолчанию 0.5)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа сервера архивов в секундах (по умолчанию 0)")
+    parser.add_argument("--tarball-size", default=DEFAULT_SIZE,
+                        help=f"Размер данных в архиве: байты, 512K, 2M или диапазон MIN-MAX, размер из диапазона"
+                             f" постоянен для архива (по умолчанию {DEFAULT_SIZE})")
+    parser.add_argument("--local-pages", action="store_true",
+                        help="Ссылки website на страницы локального сервера (для замера с --verify-urls)")
+    parser.add_argument("--table-format", choices=["xlsx", "csv", "tsv"], default="xlsx",
+                        help="Формат таблиц для обоих конвертеров (по умолчанию xlsx)")
+    parser.add_argument("--workdir", help="Каталог для сгенерированных файлов (по умолчанию временный)")
+    parser.add_argument("--no-stages", action="store_true", help="Не выполнять поэтапные замеры")
+    parser.add_argument("--startup-repeat", type=int, default=5,
+                        help="Число запусков при замере времени запуска, 0 - не замерять (по умолчанию 5)")
+    parser.add_argument("--startup-budget", type=float,
+                        help="Допустимое время запуска в секундах: при превышении код возврата 1")
+    parser.add_argument("-o", "--output", default="benchmark-results.json", help="Файл результатов (по умолчанию benchmark-results.json)")
+    parser.add_argument("--baseline", help="Результаты предыдущего запуска для сравнения")
+    parser.add_argument("converter_args", nargs=argparse.REMAINDER,
+                        help="Параметры xlsx-to-json после '--' (по умолчанию --no-cache)")
+    args = parser.parse_args()
+    if args.converter_args[:1] == ["--"]:
+        args.converter_args = args.converter_args[1:]
+    return args
+
+
+def run_process(command, env=None):
+    """
+    Запускает процесс и возвращает (код возврата, секунды, пиковая память в МБ, stdout).
+    Пиковая память берется из rusage именно этого процесса.
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env)
+    output = process.stdout.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - started
+    process.stdout.close()
+    # ru_maxrss: килобайты в Linux, байты в macOS
+    peak_rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return os.waitstatus_to_exitcode(status), seconds, peak_rss, output.decode("utf-8", "replace")
+
+
+def measure(name, command, stages_command, env, metrics_file=None):
+    code, seconds, peak_rss, output = run_process(command, env)
+    result = {"seconds": round(seconds, 3), "peak_rss_mb": round(peak_rss, 1), "exit_code": code}
+    if code:
+        result["output"] = output[-2000:]
+    if metrics_file and code == 0:
+        with open(metrics_file, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        result["stages"] = report["stages"]
+        result["counters"] = report["counters"]
+        result["downloads"] = report["downloads"]
+        downloads = report["downloads"]
+        if downloads.get("hash_seconds"):
+            result["hash_mb_per_s"] = round(downloads["bytes"] / (1024 * 1024) / downloads["hash_seconds"], 2)
+    elif stages_command:
+        code, _, _, output = run_process(stages_command, env)
+        if code == 0:
+            result["stages"] = json.loads(output.strip().splitlines()[-1])["stages"]
+    print(f"  {name}: {result['seconds']:.2f} с, {result['peak_rss_mb']:.0f} МБ"
+          + (f", код возврата {code}" if result["exit_code"] else ""))
+    for stage, stage_seconds in result.get("stages", {}).items():
+        print(f"    {stage:<14} {stage_seconds:.3f} с")
+    if "hash_mb_per_s" in result:
+        print(f"    хэширование   {result['downloads']['bytes'] / (1024 * 1024):.1f} МБ, {result['hash_mb_per_s']:.2f} МБ/с")
+    return result
+
+
+def measure_startup(python, workdir, env, table_format="xlsx", repeat=5):
+    """
+    Время запуска конвертеров: --help и преобразование BOM из STARTUP_COMPONENTS компонентов
+    без ссылок на архивы, медиана из repeat запусков.
+    """
+    bom_file = os.path.join(workdir, "startup.json")
+    table_file = os.path.join(workdir, f"startup.{table_format}")
+    generate(STARTUP_COMPONENTS, bom_file, table_file, dist_ratio=0)
+    json_to_xlsx = os.path.join(ROOT, "json-to-xlsx", "main.py")
+    xlsx_to_json = os.path.join(ROOT, "xlsx-to-json", "main.py")
+    commands = {
+        "json-to-xlsx --help": [python, json_to_xlsx, "--help"],
+        "xlsx-to-json --help": [python, xlsx_to_json, "--help"],
+        "json-to-xlsx": [python, json_to_xlsx, "-i", bom_file, "-o", os.path.join(workdir, f"startup-out.{table_format}")],
+        "xlsx-to-json": [python, xlsx_to_json, "-i", table_file, "-o", os.path.join(workdir, "startup-out.json"), "--no-cache"],
+    }
+    startup = {}
+    for name, command in commands.items():
+        times = []
+        for _ in range(repeat):
+            code, seconds, _, output = run_process(command, env)
+            if code:
+                raise RuntimeError(f"{name}: код возврата {code}\n{output[-2000:]}")
+            times.append(seconds)
+        startup[name] = round(statistics.median(times), 3)
+        print(f"  {name:<20} {startup[name]:.3f} с")
+    return startup
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline_file):
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {(run["components"], name): run[name] for run in baseline["runs"] for name in ("json-to-xlsx", "xlsx-to-json")}
+    print(f"Сравнение с {baseline_file} (ревизия {baseline.get('revision')}):")
+    for run in results["runs"]:
+        for name in ("json-to-xlsx", "xlsx-to-json"):
+            old = previous.get((run["components"], name))
+            if old and old["seconds"]:
+                new = run[name]
+                print(f"  {run['components']:>8} {name}: время x{new['seconds'] / old['seconds']:.2f},"
+                      f" память x{new['peak_rss_mb'] / max(old['peak_rss_mb'], 1):.2f}"
+                      + (f", хэширование x{new['hash_mb_per_s'] / old['hash_mb_per_s']:.2f}"
+                         if new.get("hash_mb_per_s") and old.get("hash_mb_per_s") else ""))
+    for name, seconds in results.get("startup", {}).items():
+        old = baseline.get("startup", {}).get(name)
+        if old:
+            print(f"  запуск {name}: время x{seconds / old:.2f}")
+
+
+def main():
+    args = parse_arguments()
+    converter_args = args.converter_args or ["--no-cache"]
+    sizes = [int(size) for size in args.sizes.split(",")]
+    tarball_size = parse_size(args.tarball_size)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="sbom-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    # Кэш хэшей и прочие файлы в домашнем каталоге не должны влиять на замер
+    env = dict(os.environ, HOME=workdir)
+
+    server = start_server(latency=args.latency, size=tarball_size)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    python = sys.executable
+
+    results = {
+        "revision": git_revision(),
+        "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parameters": {
+            "mix": args.mix, "dist_ratio": args.dist_ratio, "unique_ratio": args.unique_ratio,
+            "latency": args.latency, "tarball_size": list(tarball_size), "local_pages": args.local_pages,
+            "table_format": args.table_format,
+            "converter_args": converter_args
+        },
+        "runs": []
+    }
+    try:
+        if args.startup_repeat > 0:
+            print(f"Время запуска ({STARTUP_COMPONENTS} компонентов, медиана из {args.startup_repeat})")
+            results["startup"] = measure_startup(python, workdir, env, args.table_format, args.startup_repeat)
+        for size in sizes:
+            bom_file = os.path.join(workdir, f"bom-{size}.json")
+            xlsx_file = os.path.join(workdir, f"bom-{size}.{args.table_format}")
+            print(f"{size} компонентов: генерация данных")
+            started = time.perf_counter()
+            generate(size, bom_file, xlsx_file, mix=parse_mix(args.mix), dist_ratio=args.dist_ratio,
+                     unique_ratio=args.unique_ratio, base_url=base_url, local_pages=args.local_pages)
+            run = {"components": size, "generate_seconds": round(time.perf_counter() - started, 3)}
+
+            output = os.path.join(workdir, f"out-{size}.{args.table_format}")
+            run["json-to-xlsx"] = measure(
+                "json-to-xlsx",
+                [python, os.path.join(ROOT, "json-to-xlsx", "main.py"), "-i", bom_file, "-o", output],
+                None if args.no_stages else [python, os.path.join(BENCH_DIR, "stages.py"), bom_file, output],
+                env
+            )
+            output = os.path.join(workdir, f"out-{size}.json")
+            metrics_file = None if args.no_stages else os.path.join(workdir, f"metrics-{size}.json")
+            run["xlsx-to-json"] = measure(
+                "xlsx-to-json",
+                [python, os.path.join(ROOT, "xlsx-to-json", "main.py"), "-i", xlsx_file, "-o", output, *converter_args]
+                + (["--metrics-json", metrics_file] if metrics_file else []),
+                None, env, metrics_file
+            )
+            results["runs"].append(run)
+    finally:
+        server.shutdown()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4, ensure_ascii=False)
+    print(f"Результаты сохранены в файл: {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+    if args.startup_budget is not None and "startup" in results:
+        over = {name: seconds for name, seconds in results["startup"].items() if seconds > args.startup_budget}
+        for name, seconds in over.items():
+            print(f"Превышено время запуска {name}: {seconds:.3f} с (допустимо {args.startup_budget:.3f} с)")
+        if over:
+            exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/stages.py
+
+"""
+Поэтапный замер json-to-xlsx в отдельном процессе (xlsx-to-json сообщает время
+этапов сам, параметром --metrics-json).
+Выводит в stdout JSON: {"stages": {этап: секунды}, "rows": число компонентов}.
+Запуск: stages.py INPUT OUTPUT
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "runner"))
+
+from converters import load  # noqa: E402
+
+json_to_xlsx = load("json-to-xlsx")
+
+from bom_reader import iter_components  # noqa: E402
+
+
+def measure_json_to_xlsx(input_file, output_file):
+    """
+    Чтение, извлечение строк и запись идут одним потоком, поэтому время каждого
+    этапа суммируется по компонентам.
+    """
+    m = json_to_xlsx
+    stages = {"parse": 0.0, "extract": 0.0, "write": 0.0}
+    rows = 0
+    writer = m.create_writer(output_file)
+    components = iter_components(input_file)
+    while True:
+        started = time.perf_counter()
+        component = next(components, None)
+        parsed = time.perf_counter()
+        stages["parse"] += parsed - started
+        if component is None:
+            break
+        row = m.extract_component_row(component)
+        extracted = time.perf_counter()
+        stages["extract"] += extracted - parsed
+        writer.append(row)
+        stages["write"] += time.perf_counter() - extracted
+        rows += 1
+    started = time.perf_counter()
+    writer.close()
+    stages["write"] += time.perf_counter() - started
+    return stages, rows
+
+
+def main():
+    input_file, output_file = sys.argv[1:3]
+    # Вывод конвертера не должен смешиваться с JSON-результатом
+    with contextlib.redirect_stdout(io.StringIO()):
+        stages, rows = measure_json_to_xlsx(input_file, output_file)
+    print(json.dumps({"stages": {name: round(value, 4) for name, value in stages.items()}, "rows": rows}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+# common/errors.py
+
+"""
+Общие для обоих конвертеров и runner определения. Каталог common добавляется в sys.path
+модулем конвертера (xlsx-to-json/main.py, json-to-xlsx/bom_table.py) и runner/converters.py,
+поэтому в одном процессе исключение - один и тот же класс.
+"""
+
+
+class ConversionError(Exception):
+    """
+    Ошибка преобразования одного файла. Текст исключения - готовое сообщение для пользователя.
+    """
@@ -0,0 +1,125 @@
+# json-to-xlsx/bom_reader.py
+
+"""
+Потоковое чтение BOM в формате CycloneDX JSON.
+Файл читается кусками, массив components разбирается поэлементно,
+поэтому в памяти одновременно находится только текущий компонент.
+"""
+
+import json
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        if self.eof:
+            return False
+        data = self.f.read(size or self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        # Разобранная часть буфера больше не нужна
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise self.error(f"Expecting one of {chars!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """
+        Разбирает одно JSON-значение, дочитывая файл, пока значение не будет получено целиком.
+        """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # Число в конце буфера могло быть прочитано не полностью
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill(size)
+            size *= 2
+
+    def error(self, message):
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+
+def iter_bom(f, stream_keys=("components",), chunk_size=1 << 16):
+    """
+    Обходит верхний уровень BOM и выдает пары (ключ, значение).
+    Для ключей из stream_keys выдается отдельная пара на каждый элемент массива,
+    значения других типов под этими ключами пропускаются.
+    """
+    reader = _Reader(f, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise reader.error("Expecting property name")
+        reader.expect(":")
+        if key in stream_keys and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() != "]":
+                while True:
+                    yield key, reader.value()
+                    if reader.expect(",]") == "]":
+                        break
+            else:
+                reader.expect("]")
+        elif key in stream_keys:
+            reader.value()
+        else:
+            yield key, reader.value()
+        if reader.expect(",}") == "}":
+            break
+    if reader.peek():
+        raise reader.error("Extra data")
+
+
+def iter_components(input_file):
+    """
+    Выдает компоненты из массива components верхнего уровня по одному.
+    Массив dependencies тоже читается поэлементно, чтобы не загружать граф целиком.
+    """
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for key, value in iter_bom(f, stream_keys=("components", "dependencies")):
+            if key == "components":
+                yield value
+
+
+def iter_sections(input_file):
+    """
+    Выдает пары (ключ верхнего уровня, значение) в порядке файла; элементы массивов
+    components и dependencies выдаются по одному, с ключом своего массива.
+    """
+    with open(input_file, 'r', encoding='utf-8') as f:
+        yield from iter_bom(f, stream_keys=("components", "dependencies"))
@@ -0,0 +1,91 @@
+# json-to-xlsx/bom_table.py
+
+"""
+Строки таблицы компонентов и таблицы ребер зависимостей, выбор формата таблицы.
+Общие для конвертера (main.py) и объединения и сравнения BOM (merge.py).
+"""
+
+import os
+import sys
+
+from xlsx_writer import XlsxWriter
+from csv_writer import CsvWriter, DELIMITERS
+
+# ConversionError общий с xlsx-to-json и runner (каталог common рядом с каталогом конвертера)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from errors import ConversionError  # noqa: E402, F401
+
+COLUMNS = ["Component", "Version", "Type", "BOM Reference", "PURL", "externalReferences", "attack_surface", "security_function"]
+# Граф зависимостей - отдельная таблица ребер "компонент -> зависимость" (лист Dependencies1
+# в xlsx, файл <имя>.dependencies.csv рядом с CSV/TSV)
+DEPENDENCY_TABLE = "Dependencies"
+# refPurl и dependsOnPurl - PURL концов ребра (без PURL - name@version): по ним xlsx-to-json
+# находит компонент, если его BOM Reference в таблице очищен или изменен
+DEPENDENCY_COLUMNS = ["ref", "dependsOn", "refPurl", "dependsOnPurl"]
+# Обозначение корневого компонента SBOM (metadata.component) в таблице ребер:
+# xlsx-to-json подставляет вместо него bom-ref корневого компонента нового SBOM
+ROOT_REF = "metadata.component"
+
+
+def extract_component_row(component):
+    """
+    Возвращает строку таблицы для компонента в порядке колонок COLUMNS.
+    """
+    name = component.get("name", "Не указано")
+    version = component.get("version", "Не указано")
+    comp_type = component.get("type", "Не указано")
+    bom_ref = component.get("bom-ref", "Не указано")
+    purl = component.get("purl", "Не указано")
+
+    # извлечение данных externalReferences, удаляя дубликаты и оставляя только type="website"
+    external_references = list({
+        ref.get("url", "Не указано")
+        for ref in component.get("externalReferences", [])
+        if ref.get("type") == "website"
+    })
+    external_references_str = ", ".join(external_references)
+
+    # извлечение данных из properties
+    attack_surface = "Не указано"
+    security_function = "Не указано"
+    for prop in component.get("properties", []):
+        if prop.get("name") == "GOST:attack_surface":
+            attack_surface = prop.get("value", "Не указано")
+        elif prop.get("name") == "GOST:security_function":
+            security_function = prop.get("value", "Не указано")
+
+    return (name, version, comp_type, bom_ref, purl, external_references_str, attack_surface, security_function)
+
+
+def component_key(component):
+    """
+    Ключ компонента для таблицы ребер: PURL или, если его нет, name@version.
+    """
+    purl = component.get("purl")
+    return purl if purl else f"{component.get('name')}@{component.get('version')}"
+
+
+def extract_dependency_rows(dependency, root_ref=None, keys=None):
+    """
+    Выдает строки таблицы ребер для элемента dependencies: по строке на каждую зависимость.
+    bom-ref корневого компонента заменяется на ROOT_REF; keys - ключи компонентов по bom-ref
+    (component_key), для концов, которых нет среди компонентов, ключ пустой.
+    """
+    keys = keys or {}
+
+    def ref(value):
+        return ROOT_REF if root_ref is not None and value == root_ref else value
+
+    source = dependency.get("ref")
+    for target in dependency.get("dependsOn") or []:
+        yield ref(source), ref(target), keys.get(source, ""), keys.get(target, "")
+
+
+def create_writer(output_file, columns=COLUMNS):
+    """
+    Выбирает формат таблицы по расширению выходного файла: CSV, TSV или (для остальных) xlsx.
+    """
+    delimiter = DELIMITERS.get(os.path.splitext(output_file)[1].lower())
+    if delimiter is not None:
+        return CsvWriter(output_file, columns, delimiter)
+    return XlsxWriter(output_file, columns)
@@ -0,0 +1,63 @@
+# json-to-xlsx/csv_writer.py
+
+import csv
+import os
+
+# Расширение выходного файла -> разделитель полей
+DELIMITERS = {".csv": ",", ".tsv": "\t"}
+
+
+def companion_path(output_file, name):
+    """
+    Путь к дополнительной таблице рядом с основной: bom.csv, "Dependencies" -> bom.dependencies.csv.
+    """
+    base, extension = os.path.splitext(output_file)
+    return f"{base}.{name.lower()}{extension}"
+
+
+class CsvWriter:
+    """
+    Построчная запись таблицы в CSV/TSV с тем же набором колонок, что и XlsxWriter.
+    Файл создается при записи первой строки (как и xlsx - не раньше, чем появятся данные)
+    и пишется в UTF-8 с BOM, чтобы Excel открывал его без выбора кодировки.
+    """
+
+    def __init__(self, output_file, columns, delimiter=","):
+        self.output_file = output_file
+        self.columns = columns
+        self.delimiter = delimiter
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        self._tables = []
+
+    def _open(self):
+        self._file = open(self.output_file, "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file, delimiter=self.delimiter)
+        self._writer.writerow(self.columns)
+
+    def append(self, row):
+        if self._writer is None:
+            self._open()
+        self._writer.writerow(row)
+        self.rows += 1
+
+    def table(self, columns, name):
+        """
+        Дополнительная таблица в отдельном файле рядом с основной (см. companion_path).
+        Файл пишется, только если в таблицу записана хотя бы одна строка, и закрывается вместе
+        с основной; файл пустой таблицы от предыдущей записи удаляется.
+        """
+        table = CsvWriter(companion_path(self.output_file, name), columns, self.delimiter)
+        self._tables.append(table)
+        return table
+
+    def close(self):
+        if self._writer is None:
+            self._open()
+        self._file.close()
+        for table in self._tables:
+            if table.rows:
+                table.close()
+            elif os.path.exists(table.output_file):
+                os.remove(table.output_file)
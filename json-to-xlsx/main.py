@@ -2,69 +2,77 @@
 
 import argparse
 import json
-import pandas as pd
 import os
 
-parser = argparse.ArgumentParser(description="Обработка BOM файла и экспорт данных компонентов в Excel")
-parser.add_argument("-i", "--input", required=True, help="Путь к входному JSON-файлу (например, bom.json)")
+from bom_reader import iter_sections
+from bom_table import DEPENDENCY_COLUMNS, DEPENDENCY_TABLE, ROOT_REF, ConversionError
+from bom_table import component_key, create_writer, extract_component_row, extract_dependency_rows
 
-args = parser.parse_args()
 
-# чтение входного файла
-input_file = args.input
-try:
-    with open(input_file, 'r', encoding='utf-8') as f:
-        json_data = json.load(f)
-except FileNotFoundError:
-    print(f"Ошибка: Файл '{input_file}' не найден.")
-    exit(1)
-except json.JSONDecodeError:
-    print(f"Ошибка: Файл '{input_file}' не является корректным JSON")
-    exit(1)
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Обработка BOM файла и экспорт данных компонентов в Excel")
+    parser.add_argument("-i", "--input", required=True, help="Путь к входному JSON-файлу (например, bom.json)")
+    parser.add_argument("-o", "--output", help="Путь к выходному файлу: .xlsx, .csv или .tsv (по умолчанию <имя входного файла>.xlsx в текущем каталоге)")
+    return parser.parse_args(argv)
 
-# генерируем имя выходного файла
-base_name = os.path.splitext(os.path.basename(input_file))[0]
-output_file = f"{base_name}.xlsx"
 
-# извлечение данных компонентов
-components_data = []
-for component in json_data.get("components", []):
-    name = component.get("name", "Не указано")
-    version = component.get("version", "Не указано")
-    comp_type = component.get("type", "Не указано")
-    bom_ref = component.get("bom-ref", "Не указано")
-    purl = component.get("purl", "Не указано")
+def convert(input_file, output_file=None):
+    """
+    Преобразует один BOM в таблицу (xlsx, CSV или TSV) и возвращает путь к результату.
+    При ошибке выбрасывает ConversionError.
+    """
+    # генерируем имя выходного файла
+    if not output_file:
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        output_file = f"{base_name}.xlsx"
 
-    # извлечение данных externalReferences, удаляя дубликаты и оставляя только type="website"
-    external_references = list({
-        ref.get("url", "Не указано")
-        for ref in component.get("externalReferences", [])
-        if ref.get("type") == "website"
-    })
-    external_references_str = ", ".join(external_references)
+    # чтение входного файла, извлечение данных компонентов и экспорт в таблицу по одному компоненту,
+    # без загрузки всего BOM и всей таблицы в память; ребра графа зависимостей - в отдельную таблицу
+    writer = create_writer(output_file)
+    dependency_writer = writer.table(DEPENDENCY_COLUMNS, DEPENDENCY_TABLE)
+    root_ref = None
+    # Ключи компонентов по bom-ref для таблицы ребер (раздел components идет перед dependencies)
+    keys = {}
+    unknown = 0
+    try:
+        for key, value in iter_sections(input_file):
+            if key == "components":
+                writer.append(extract_component_row(value))
+                if value.get("bom-ref") is not None:
+                    keys.setdefault(value["bom-ref"], component_key(value))
+            elif key == "dependencies":
+                for row in extract_dependency_rows(value, root_ref, keys):
+                    dependency_writer.append(row)
+                    source, target, source_key, target_key = row
+                    unknown += (source != ROOT_REF and not source_key) + (target != ROOT_REF and not target_key)
+            elif key == "metadata" and isinstance(value, dict):
+                root_ref = (value.get("component") or {}).get("bom-ref")
+        writer.close()
+    except FileNotFoundError as e:
+        if e.filename == input_file:
+            raise ConversionError(f"Ошибка: Файл '{input_file}' не найден.")
+        raise ConversionError(f"Ошибка при записи файла '{output_file}': {e}")
+    except json.JSONDecodeError:
+        raise ConversionError(f"Ошибка: Файл '{input_file}' не является корректным JSON")
+    except OSError as e:
+        raise ConversionError(f"Ошибка при записи файла '{output_file}': {e}")
 
-    # извлечение данных из properties
-    attack_surface = "Не указано"
-    security_function = "Не указано"
-    for prop in component.get("properties", []):
-        if prop.get("name") == "GOST:attack_surface":
-            attack_surface = prop.get("value", "Не указано")
-        elif prop.get("name") == "GOST:security_function":
-            security_function = prop.get("value", "Не указано")
+    print(f"Данные сохранены в файл: {output_file}")
+    if dependency_writer.rows:
+        print(f"Зависимостей сохранено: {dependency_writer.rows}")
+    if unknown:
+        print(f"Предупреждение: Концов ребер зависимостей, которых нет среди компонентов: {unknown}")
+    return output_file
 
-    components_data.append({
-        "Component": name,
-        "Version": version,
-        "Type": comp_type,
-        "BOM Reference": bom_ref,
-        "PURL": purl,
-        "externalReferences": external_references_str,
-        "attack_surface": attack_surface,
-        "security_function": security_function
-    })
 
-# экспорт в Excel
-df = pd.DataFrame(components_data)
-df.to_excel(output_file, index=False)
-print(f"Данные сохранены в файл: {output_file}")
+def main():
+    args = parse_arguments()
+    try:
+        convert(args.input, args.output)
+    except ConversionError as e:
+        print(e)
+        exit(1)
 
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# json-to-xlsx/merge.py
+
+"""
+Объединение и сравнение BOM (выгрузок Dependency-Track) на основе извлечения строк json-to-xlsx.
+Компоненты сопоставляются через хэш-таблицу по нормализованному PURL (без PURL - по имени и
+версии); каждый BOM читается потоково один раз, поэтому время линейно по суммарному числу
+компонентов, а память - по числу уникальных компонентов.
+
+    python json-to-xlsx/merge.py merge a.json b.json c.json -o merged.xlsx
+    python json-to-xlsx/merge.py diff old.json new.json -o diff.xlsx
+"""
+
+import argparse
+import json
+from functools import lru_cache
+from urllib.parse import unquote
+
+from bom_reader import iter_components
+from bom_table import COLUMNS, ConversionError, create_writer, extract_component_row
+
+MERGE_COLUMNS = COLUMNS + ["Sources"]
+DIFF_COLUMNS = ["Change", "Component", "Version", "Previous Version", "Type", "PURL", "Previous PURL", "Changed Fields"]
+# Колонки, изменения которых отмечаются в diff (BOM Reference различается между выгрузками)
+COMPARED_COLUMNS = ["Type", "externalReferences", "attack_surface", "security_function"]
+# Типы purl, в которых namespace и name не зависят от регистра (purl-spec; идентификаторы NuGet
+# также сравниваются без учета регистра)
+CASE_INSENSITIVE_TYPES = {"alpm", "apk", "bitbucket", "composer", "deb", "github", "hex", "npm", "nuget", "pypi"}
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Объединение и сравнение BOM по нормализованному PURL")
+    commands = parser.add_subparsers(dest="command", required=True)
+    merge_parser = commands.add_parser("merge", help="Объединить BOM в один список компонентов без повторов с колонкой Sources")
+    merge_parser.add_argument("inputs", nargs="+", help="Входные JSON-файлы BOM")
+    merge_parser.add_argument("-o", "--output", default="merged.xlsx", help="Путь к выходному файлу: .xlsx, .csv или .tsv (по умолчанию merged.xlsx)")
+    diff_parser = commands.add_parser("diff", help="Сравнить два BOM: добавленные, удаленные и измененные компоненты")
+    diff_parser.add_argument("old", help="Предыдущий BOM")
+    diff_parser.add_argument("new", help="Новый BOM")
+    diff_parser.add_argument("-o", "--output", default="diff.xlsx", help="Путь к выходному файлу: .xlsx, .csv или .tsv (по умолчанию diff.xlsx)")
+    return parser.parse_args(argv)
+
+
+@lru_cache(maxsize=65536)
+def normalize_purl(purl):
+    """
+    Разбирает PURL в пару (канонический PURL без версии, версия) или возвращает None, если
+    строка не является PURL. Тип приводится к нижнему регистру, namespace и name декодируются
+    (%40 -> @) и для типов из CASE_INSENSITIVE_TYPES приводятся к нижнему регистру (для pypi
+    "_" заменяется на "-"), qualifiers сортируются по ключу, пустые отбрасываются.
+    """
+    if not purl[:4].lower() == "pkg:":
+        return None
+    rest, _, subpath = purl[4:].lstrip("/").partition("#")
+    rest, _, qualifiers = rest.partition("?")
+    path, at, version = rest.rpartition("@")
+    # "@" перед последним "/" - начало npm scope, а не версия
+    if not at or "/" in version:
+        path, version = rest, ""
+    type_name, separator, name = path.partition("/")
+    if not separator or not name:
+        return None
+    type_name = type_name.lower()
+    name = "/".join(unquote(segment) for segment in name.strip("/").split("/") if segment)
+    if type_name in CASE_INSENSITIVE_TYPES:
+        name = name.lower()
+        if type_name == "pypi":
+            name = name.replace("_", "-")
+    canonical = f"pkg:{type_name}/{name}"
+    pairs = sorted(
+        (key.lower(), unquote(value))
+        for key, _, value in (item.partition("=") for item in qualifiers.split("&"))
+        if key and value
+    )
+    if pairs:
+        canonical += "?" + "&".join(f"{key}={value}" for key, value in pairs)
+    subpath = "/".join(segment for segment in subpath.split("/") if segment not in ("", ".", ".."))
+    if subpath:
+        canonical += "#" + subpath
+    return canonical, unquote(version)
+
+
+def component_key(component):
+    """
+    Ключ сопоставления компонента: ("purl", канонический PURL без версии, версия) или, если
+    PURL нет или он некорректен, ("name", имя, версия). Первые два элемента - ключ компонента
+    без версии, по нему в diff сопоставляются версии одного компонента.
+    """
+    purl = component.get("purl")
+    if isinstance(purl, str):
+        normalized = normalize_purl(purl.strip())
+        if normalized is not None:
+            return ("purl",) + normalized
+    return "name", str(component.get("name", "")).strip(), str(component.get("version", "")).strip()
+
+
+def iter_bom_components(input_file):
+    """
+    Компоненты BOM по одному; ошибки чтения превращаются в ConversionError.
+    """
+    try:
+        yield from iter_components(input_file)
+    except FileNotFoundError:
+        raise ConversionError(f"Ошибка: Файл '{input_file}' не найден.")
+    except json.JSONDecodeError:
+        raise ConversionError(f"Ошибка: Файл '{input_file}' не является корректным JSON")
+    except OSError as e:
+        raise ConversionError(f"Ошибка при чтении файла '{input_file}': {e}")
+
+
+def write_rows(output_file, columns, rows):
+    writer = create_writer(output_file, columns)
+    try:
+        for row in rows:
+            writer.append(row)
+        writer.close()
+    except OSError as e:
+        raise ConversionError(f"Ошибка при записи файла '{output_file}': {e}")
+
+
+def merge_boms(input_files):
+    """
+    Объединяет компоненты нескольких BOM. Возвращает (строки MERGE_COLUMNS в порядке первого
+    появления, число прочитанных компонентов). Строка компонента берется из первого BOM, в
+    котором он встретился; в Sources перечисляются все BOM, содержащие компонент.
+    """
+    positions = {}
+    rows = []
+    # Множество BOM компонента - битовая маска по номерам входных файлов
+    masks = []
+    total = 0
+    for number, input_file in enumerate(input_files):
+        bit = 1 << number
+        for component in iter_bom_components(input_file):
+            total += 1
+            position = positions.setdefault(component_key(component), len(rows))
+            if position == len(rows):
+                rows.append(extract_component_row(component))
+                masks.append(bit)
+            else:
+                masks[position] |= bit
+
+    # Различных наборов источников обычно немного, строка Sources строится один раз на набор
+    sources = {}
+
+    def source_names(mask):
+        names = sources.get(mask)
+        if names is None:
+            names = sources[mask] = ", ".join(name for number, name in enumerate(input_files) if mask >> number & 1)
+        return names
+
+    merged = (row + (source_names(mask),) for row, mask in zip(rows, masks))
+    return merged, total, len(rows)
+
+
+def _comparable(row):
+    values = dict(zip(COLUMNS, row))
+    # Порядок ссылок website в строке не определен
+    values["externalReferences"] = frozenset(url for url in values["externalReferences"].split(", ") if url)
+    return values
+
+
+def changed_fields(old_row, new_row):
+    old_values = _comparable(old_row)
+    new_values = _comparable(new_row)
+    return [column for column in COMPARED_COLUMNS if old_values[column] != new_values[column]]
+
+
+def diff_boms(old_file, new_file):
+    """
+    Сравнивает два BOM. Возвращает строки DIFF_COLUMNS: сначала измененные компоненты (другие
+    значения колонок COMPARED_COLUMNS или другая версия того же компонента), затем добавленные,
+    затем удаленные. Предыдущий BOM хранится в хэш-таблице, новый читается потоково.
+    """
+    old = {}
+    for component in iter_bom_components(old_file):
+        old.setdefault(component_key(component), extract_component_row(component))
+
+    changed = []
+    added = []
+    seen = set()
+    for component in iter_bom_components(new_file):
+        key = component_key(component)
+        if key in seen:
+            continue
+        seen.add(key)
+        row = extract_component_row(component)
+        old_row = old.pop(key, None)
+        if old_row is None:
+            added.append((key, row))
+            continue
+        fields = changed_fields(old_row, row)
+        if fields:
+            changed.append(("changed", row[0], row[1], old_row[1], row[2], row[4], old_row[4], ", ".join(fields)))
+    del seen
+
+    # Удаленная и добавленная версии одного компонента - изменение версии
+    removed_versions = {}
+    for key, old_row in old.items():
+        removed_versions.setdefault(key[:2], []).append(key)
+    added_rows = []
+    for key, row in added:
+        candidates = removed_versions.get(key[:2])
+        if not candidates:
+            added_rows.append(("added", row[0], row[1], "", row[2], row[4], "", ""))
+            continue
+        old_row = old.pop(candidates.pop(0))
+        fields = ["Version"] + changed_fields(old_row, row)
+        changed.append(("changed", row[0], row[1], old_row[1], row[2], row[4], old_row[4], ", ".join(fields)))
+    removed_rows = [("removed", row[0], row[1], "", row[2], row[4], "", "") for row in old.values()]
+    return changed, added_rows, removed_rows
+
+
+def main():
+    args = parse_arguments()
+    try:
+        if args.command == "merge":
+            rows, total, unique = merge_boms(args.inputs)
+            write_rows(args.output, MERGE_COLUMNS, rows)
+            print(f"Входных BOM: {len(args.inputs)}, компонентов: {total}, без повторов: {unique}")
+        else:
+            changed, added, removed = diff_boms(args.old, args.new)
+            write_rows(args.output, DIFF_COLUMNS, changed + added + removed)
+            print(f"Изменено: {len(changed)}, добавлено: {len(added)}, удалено: {len(removed)}")
+        print(f"Данные сохранены в файл: {args.output}")
+    except ConversionError as e:
+        print(e)
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# json-to-xlsx/xlsx_writer.py
+
+# openpyxl импортируется при создании книги: запись CSV/TSV и --help обходятся без него
+
+# Ограничение Excel на число строк листа (вместе со строкой заголовка)
+MAX_ROWS = 1048576
+
+
+class XlsxWriter:
+    """
+    Построчная запись таблицы в xlsx в режиме write-only: строки сразу уходят
+    во временный файл листа и не накапливаются в памяти. При достижении предела
+    строк Excel запись продолжается на новом листе (Sheet2, Sheet3, ...) с тем же заголовком.
+    """
+
+    def __init__(self, output_file, columns, sheet_prefix="Sheet", max_rows=MAX_ROWS, workbook=None):
+        self.output_file = output_file
+        self.columns = columns
+        self.sheet_prefix = sheet_prefix
+        self.max_rows = max_rows
+        self.rows = 0
+        # Дополнительная таблица пишется в книгу основной и не сохраняет ее сама
+        self._owner = workbook is None
+        if workbook is None:
+            from openpyxl import Workbook
+            workbook = Workbook(write_only=True)
+        self._workbook = workbook
+        self._sheet = None
+        self._sheet_rows = 0
+        self._sheets = 0
+
+    def _new_sheet(self):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Border, Font, Side
+
+        self._sheets += 1
+        self._sheet = self._workbook.create_sheet(f"{self.sheet_prefix}{self._sheets}")
+        # Оформление заголовка как у pandas.DataFrame.to_excel
+        thin = Side(style="thin")
+        header = []
+        for column in self.columns:
+            cell = WriteOnlyCell(self._sheet, value=column)
+            cell.font = Font(bold=True)
+            cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            cell.alignment = Alignment(horizontal="center", vertical="top")
+            header.append(cell)
+        self._sheet.append(header)
+        self._sheet_rows = 1
+
+    def append(self, row):
+        if self._sheet is None or self._sheet_rows >= self.max_rows:
+            self._new_sheet()
+        self._sheet.append(row)
+        self._sheet_rows += 1
+        self.rows += 1
+
+    def table(self, columns, sheet_prefix):
+        """
+        Дополнительная таблица в той же книге, на своих листах (sheet_prefix1, sheet_prefix2, ...).
+        Листы создаются при записи первой строки; книгу сохраняет close() основной таблицы.
+        """
+        return XlsxWriter(self.output_file, columns, sheet_prefix, self.max_rows, self._workbook)
+
+    def close(self):
+        if not self._owner:
+            return
+        if self._sheet is None:
+            self._new_sheet()
+        self._workbook.save(self.output_file)
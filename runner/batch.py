@@ -0,0 +1,250 @@
+# runner/batch.py
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import SimpleQueue
+
+from converters import ConversionError, load
+
+# Направление -> (расширение входных файлов, расширение результата); ".xlsx" заменяется
+# расширением из --table-format
+DIRECTIONS = {
+    "xlsx-to-json": (".xlsx", ".json"),
+    "json-to-xlsx": (".json", ".xlsx"),
+}
+TABLE_FORMATS = ("xlsx", "csv", "tsv")
+# Таблицы зависимостей, которые json-to-xlsx пишет рядом с CSV/TSV (bom.dependencies.csv):
+# они читаются вместе с основной таблицей, а не как отдельные входы
+COMPANION_SUFFIXES = (".dependencies",)
+
+# Состояние процесса-исполнителя: конвертер направления и общие для всех его файлов HTTP-клиент и хэшер
+_worker = {}
+
+
+def parse_arguments(argv=None):
+    """
+    Параметры после "--" передаются конвертеру xlsx-to-json без изменений,
+    например: batch.py -d xlsx-to-json exports/ -- --hasher cpverify --jobs 4
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    converter_args = []
+    if "--" in argv:
+        index = argv.index("--")
+        argv, converter_args = argv[:index], argv[index + 1:]
+
+    parser = argparse.ArgumentParser(description="Пакетное преобразование файлов BOM в пуле процессов")
+    parser.add_argument("inputs", nargs="+", help="Входные файлы, каталоги или шаблоны (например, 'exports/*.json')")
+    parser.add_argument("-d", "--direction", required=True, choices=list(DIRECTIONS), help="Направление преобразования")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Число процессов (по умолчанию по числу ядер)")
+    parser.add_argument("-o", "--output-dir", help="Каталог для результатов (по умолчанию как у конвертера)")
+    parser.add_argument("--table-format", choices=TABLE_FORMATS, default="xlsx",
+                        help="Формат таблиц: входных для xlsx-to-json, выходных для json-to-xlsx (по умолчанию xlsx)")
+    parser.add_argument("--summary-json", help="Сохранить результаты по файлам и итог в JSON-файл")
+    args = parser.parse_args(argv)
+    args.converter_args = converter_args
+    return args
+
+
+def _without_companions(paths):
+    return sorted(path for path in paths if not os.path.splitext(path)[0].endswith(COMPANION_SUFFIXES))
+
+
+def collect_inputs(patterns, extension):
+    """
+    Раскрывает каталоги (файлы с нужным расширением) и шаблоны в список файлов без повторов.
+    Несуществующий путь остается в списке и завершится ошибкой для этого файла.
+    Таблицы зависимостей рядом с CSV/TSV при раскрытии пропускаются.
+    """
+    files = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = _without_companions(glob.glob(os.path.join(pattern, f"*{extension}")))
+        else:
+            matches = _without_companions(glob.glob(pattern)) or [pattern]
+        for path in matches:
+            files.setdefault(os.path.normpath(path), None)
+    return list(files)
+
+
+def direction_extensions(direction, table_format="xlsx"):
+    """
+    Расширения входных файлов и результатов направления с учетом формата таблиц.
+    """
+    return tuple(f".{table_format}" if extension == ".xlsx" else extension for extension in DIRECTIONS[direction])
+
+
+def output_path(input_file, output_dir, extension):
+    if not output_dir:
+        return None
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(output_dir, base_name + extension)
+
+
+def init_worker(direction, converter_args, started=None):
+    """
+    Инициализирует процесс-исполнитель. В started (SimpleQueue) исполнитель сообщает имя
+    каждого файла перед его преобразованием: так после аварийного завершения процесса
+    известно, какие файлы в этот момент выполнялись.
+    """
+    converter = load(direction)
+    _worker["direction"] = direction
+    _worker["converter"] = converter
+    _worker["converter_args"] = converter_args
+    _worker["started"] = started
+    if direction == "xlsx-to-json":
+        # Файлы и так хэшируются параллельно в процессах пакета: встроенный хэшер - в потоке загрузки
+        args = converter.parse_arguments(["-i", "", "--hash-workers", "1", *converter_args])
+        _worker["hasher"] = converter.create_hasher(args)
+        _worker["transport"] = converter.create_transport(args)
+
+
+def convert_file(input_file, output_file=None):
+    """
+    Преобразует один файл в процессе-исполнителе. Ошибка файла не прерывает пакет,
+    а возвращается в результате вместе с выводом конвертера.
+    """
+    if _worker["started"] is not None:
+        _worker["started"].put(input_file)
+    converter = _worker["converter"]
+    result = {"input": input_file, "output": None, "ok": False, "error": None, "seconds": 0.0}
+    started = time.monotonic()
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            if _worker["direction"] == "xlsx-to-json":
+                argv = ["-i", input_file, *_worker["converter_args"]]
+                if output_file:
+                    argv += ["-o", output_file]
+                args = converter.parse_arguments(argv)
+                result["output"] = converter.convert(args, _worker["hasher"], _worker["transport"])
+            else:
+                result["output"] = converter.convert(input_file, output_file)
+        result["ok"] = True
+    except ConversionError as e:
+        result["error"] = str(e)
+    except Exception as e:
+        result["error"] = f"Непредвиденная ошибка: {type(e).__name__}: {e}"
+    result["seconds"] = round(time.monotonic() - started, 3)
+    result["log"] = log.getvalue()
+    return result
+
+
+def _failed(input_file, error):
+    return {"input": input_file, "output": None, "ok": False,
+            "error": f"Процесс-исполнитель завершился аварийно: {error}", "seconds": 0.0, "log": ""}
+
+
+def _run_pool(files, workers, direction, converter_args, outputs, results):
+    """
+    Преобразует files пулом процессов и заносит результаты в results. Аварийное завершение
+    одного исполнителя (например, нехватка памяти) останавливает весь пул; тогда возвращается
+    пара (файлы, которые в этот момент выполнялись, файлы, до которых очередь не дошла).
+    """
+    started = SimpleQueue()
+    broken = []
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(files))), initializer=init_worker,
+                             initargs=(direction, list(converter_args), started)) as executor:
+        futures = [executor.submit(convert_file, input_file, outputs[input_file]) for input_file in files]
+        for input_file, future in zip(files, futures):
+            try:
+                results[input_file] = future.result()
+            except BrokenProcessPool:
+                broken.append(input_file)
+                continue
+            except Exception as e:
+                results[input_file] = _failed(input_file, e)
+            print_result(results[input_file])
+    running = set()
+    while not started.empty():
+        running.add(started.get())
+    started.close()
+    in_flight = [input_file for input_file in broken if input_file in running]
+    # Если исполнитель завершился до начала преобразования (например, в инициализации), виновник неизвестен
+    if broken and not in_flight:
+        return broken, []
+    return in_flight, [input_file for input_file in broken if input_file not in running]
+
+
+def run_batch(inputs, direction, workers, output_dir=None, converter_args=(), table_format="xlsx"):
+    """
+    Преобразует файлы пулом процессов. Результаты возвращаются в порядке входных файлов.
+    Если процесс-исполнитель завершился аварийно, файлы, которые он мог выполнять, повторяются
+    по одному в отдельном процессе (аварийный из них получает ошибку), а остальные - в новом пуле.
+    """
+    extension = direction_extensions(direction, table_format)[1]
+    if extension != DIRECTIONS[direction][1] and not output_dir:
+        # json-to-xlsx по умолчанию пишет <имя>.xlsx в текущий каталог; другой формат задается именем результата
+        output_dir = "."
+    outputs = {input_file: output_path(input_file, output_dir, extension) for input_file in inputs}
+    results = {}
+    pending = list(inputs)
+    while pending:
+        in_flight, pending = _run_pool(pending, workers, direction, converter_args, outputs, results)
+        for input_file in in_flight:
+            crashed, _ = _run_pool([input_file], 1, direction, converter_args, outputs, results)
+            if crashed:
+                results[input_file] = _failed(input_file, "повторно, в отдельном процессе")
+                print_result(results[input_file])
+    return [results[input_file] for input_file in inputs]
+
+
+def print_result(result):
+    if result["ok"]:
+        print(f"[ок] {result['input']} -> {result['output']} ({result['seconds']:.1f} с)")
+    else:
+        print(f"[ошибка] {result['input']}: {result['error']}")
+
+
+def save_summary(summary, output_file):
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=4, ensure_ascii=False)
+    except Exception as e:
+        print(f"Ошибка при записи итогов: {e}")
+        exit(1)
+
+
+def main():
+    args = parse_arguments()
+    if args.direction == "xlsx-to-json":
+        # Неверные параметры конвертера обнаруживаются до запуска пула
+        load("xlsx-to-json").parse_arguments(["-i", "", *args.converter_args])
+
+    inputs = collect_inputs(args.inputs, direction_extensions(args.direction, args.table_format)[0])
+    if not inputs:
+        print("Ошибка: Не найдено ни одного входного файла.")
+        exit(1)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    started = time.monotonic()
+    results = run_batch(inputs, args.direction, args.workers, args.output_dir, args.converter_args, args.table_format)
+    failed = sum(not result["ok"] for result in results)
+    seconds = round(time.monotonic() - started, 3)
+    print(f"Файлов: {len(results)}, успешно: {len(results) - failed}, с ошибками: {failed}, время: {seconds:.1f} с")
+
+    if args.summary_json:
+        save_summary({
+            "direction": args.direction,
+            "files": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "seconds": seconds,
+            "results": results
+        }, args.summary_json)
+
+    if failed:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# runner/converters.py
+
+"""
+Загрузка конвертера как модуля текущего процесса.
+Каталоги xlsx-to-json и json-to-xlsx не являются пакетами: их модули импортируют соседей
+по короткому имени (main, model, bom_reader, ...) через sys.path, в том числе лениво, внутри
+функций. Поэтому в одном процессе загружается только один конвертер, и его модули не могут
+подменить модули другого; второй конвертер выполняется в отдельном процессе (см. batch.py).
+Общий для конвертеров ConversionError (каталог common) доступен отсюда до загрузки конвертера.
+"""
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMON = os.path.join(ROOT, "common")
+if COMMON not in sys.path:
+    sys.path.append(COMMON)
+
+from errors import ConversionError  # noqa: E402, F401
+# Направление -> (каталог конвертера, имя модуля для его main.py)
+CONVERTERS = {
+    "xlsx-to-json": ("xlsx-to-json", "xlsx_to_json_main"),
+    "json-to-xlsx": ("json-to-xlsx", "json_to_xlsx_main"),
+}
+
+_loaded = {}
+
+
+def load(direction):
+    """
+    Возвращает модуль main.py конвертера направления direction, загружая его при первом вызове.
+    Попытка загрузить в тот же процесс второй конвертер - ошибка RuntimeError.
+    """
+    if direction in _loaded:
+        return _loaded[direction]
+    if _loaded:
+        other = next(iter(_loaded))
+        raise RuntimeError(f"В процессе уже загружен конвертер {other}; {direction} выполняется в отдельном процессе")
+    directory, module_name = CONVERTERS[direction]
+    path = os.path.join(ROOT, directory)
+    # Каталог другого конвертера (например, унаследованный дочерним процессом) из sys.path убирается
+    others = {os.path.join(ROOT, other) for other, _ in CONVERTERS.values()} - {path}
+    sys.path[:] = [entry for entry in sys.path if entry not in others]
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(path, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    _loaded[direction] = module
+    return module
@@ -0,0 +1,472 @@
+# runner/service.py
+
+"""
+Резидентный режим: HTTP API (TCP или Unix-сокет) и наблюдение за каталогом таблиц.
+Процесс загружает xlsx-to-json один раз и держит между преобразованиями нормализацию PURL
+(LRU-кэши PurlEngine), пул соединений, хэшер и найденные хэши архивов (HashMemory) в памяти.
+Все кэши ограничены по размеру и вытесняют давно не использованные записи. json-to-xlsx
+выполняется в отдельном постоянном процессе, чтобы модули двух конвертеров не смешивались.
+
+    python runner/service.py --port 8700 -- --hasher cpverify --jobs 8
+    python runner/service.py --socket /run/sbomtransfer.sock
+    python runner/service.py --watch audit/ --output-dir sbom/ --incremental
+
+    curl --data-binary @bom.xlsx http://127.0.0.1:8700/xlsx-to-json -o bom.json
+    curl --data-binary @bom.json 'http://127.0.0.1:8700/json-to-xlsx?format=csv' -o bom.zip
+    curl --data-binary @bom.zip 'http://127.0.0.1:8700/xlsx-to-json?format=csv' -o bom.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from batch import COMPANION_SUFFIXES, TABLE_FORMATS, convert_file, init_worker, print_result
+from converters import ConversionError, load
+
+CONTENT_TYPES = {
+    ".json": "application/json",
+    ".gz": "application/gzip",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".csv": "text/csv; charset=utf-8",
+    ".tsv": "text/tab-separated-values; charset=utf-8",
+    ".zip": "application/zip",
+}
+CHUNK_SIZE = 1 << 16
+
+
+def parse_arguments(argv=None):
+    """
+    Параметры после "--" передаются конвертеру xlsx-to-json без изменений (как в batch.py).
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    converter_args = []
+    if "--" in argv:
+        index = argv.index("--")
+        argv, converter_args = argv[:index], argv[index + 1:]
+
+    parser = argparse.ArgumentParser(description="Резидентный сервис преобразования BOM: HTTP API и наблюдение за каталогом")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес HTTP API (по умолчанию 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="Порт HTTP API")
+    parser.add_argument("--socket", help="Путь к Unix-сокету HTTP API")
+    parser.add_argument("--max-body-mb", type=int, default=256, help="Максимальный размер входного файла запроса в МБ (по умолчанию 256)")
+    parser.add_argument("--watch", help="Каталог таблиц: при изменении таблицы SBOM пересоздается")
+    parser.add_argument("--output-dir", help="Каталог для SBOM в режиме --watch (по умолчанию рядом с таблицей)")
+    parser.add_argument("--interval", type=float, default=2.0, help="Период опроса каталога в секундах (по умолчанию 2)")
+    parser.add_argument("--incremental", action="store_true", help="В режиме --watch передавать предыдущий SBOM как --previous")
+    parser.add_argument("--hash-memory-entries", type=int, default=65536,
+                        help="Число хэшей архивов, хранимых в памяти между преобразованиями (по умолчанию 65536)")
+    args = parser.parse_args(argv)
+    if args.port is None and not args.socket and not args.watch:
+        parser.error("укажите --port, --socket или --watch")
+    args.converter_args = converter_args
+    return args
+
+
+class ConversionService:
+    """
+    Общее состояние резидентного процесса. Преобразования выполняются по одному (сбор метрик
+    и вывод конвертеров общие для процесса), каждое - с параллельной загрузкой архивов внутри.
+    """
+
+    def __init__(self, converter_args=(), hash_memory_entries=65536):
+        self.converter_args = list(converter_args)
+        self.converter = load("xlsx-to-json")
+        self.options = self.converter.parse_arguments(["-i", "", *self.converter_args])
+        self.hasher = self.converter.create_hasher(self.options)
+        self.transport = self.converter.create_transport(self.options)
+        # hash_cache доступен после load: каталог xlsx-to-json уже в sys.path
+        from hash_cache import HashMemory
+
+        self.hash_memory = HashMemory(hash_memory_entries)
+        self._json_to_xlsx = None
+        self.conversions = 0
+        self.failures = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _convert_json_to_xlsx(self, input_file, output_file):
+        """
+        Преобразование json-to-xlsx в отдельном процессе (создается при первом запросе, spawn -
+        без копирования потоков сервера). Вызывается под self._lock.
+        """
+        if self._json_to_xlsx is None:
+            self._json_to_xlsx = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker, initargs=("json-to-xlsx", [])
+            )
+        try:
+            return self._json_to_xlsx.submit(convert_file, input_file, output_file).result()
+        except BrokenProcessPool as e:
+            # Следующий запрос запустит новый процесс
+            self._json_to_xlsx = None
+            return {"input": input_file, "output": None, "ok": False,
+                    "error": f"Процесс json-to-xlsx завершился аварийно: {e}", "seconds": 0.0, "log": ""}
+
+    def convert(self, direction, input_file, output_file=None, extra_args=()):
+        """
+        Преобразует один файл. Возвращает результат в виде, принятом в batch.py:
+        {"input", "output", "ok", "error", "seconds", "log"}.
+        """
+        if direction != "xlsx-to-json":
+            with self._lock:
+                result = self._convert_json_to_xlsx(input_file, output_file)
+                self.conversions += 1
+                self.failures += not result["ok"]
+            return result
+        result = {"input": input_file, "output": None, "ok": False, "error": None, "seconds": 0.0}
+        log = io.StringIO()
+        with self._lock:
+            started = time.monotonic()
+            try:
+                with contextlib.redirect_stdout(log):
+                    argv = ["-i", input_file, *self.converter_args, *extra_args]
+                    if output_file:
+                        argv += ["-o", output_file]
+                    args = self.converter.parse_arguments(argv)
+                    result["output"] = self.converter.convert(args, self.hasher, self.transport, self.hash_memory)
+                result["ok"] = True
+            except ConversionError as e:
+                result["error"] = str(e)
+            except Exception as e:
+                result["error"] = f"Непредвиденная ошибка: {type(e).__name__}: {e}"
+            result["seconds"] = round(time.monotonic() - started, 3)
+            self.conversions += 1
+            self.failures += not result["ok"]
+        result["log"] = log.getvalue()
+        return result
+
+    def report(self, result):
+        """
+        Выводит результат преобразования; под блокировкой, чтобы вывод не попал в перехваченный
+        вывод преобразования из другого потока.
+        """
+        with self._lock:
+            print_result(result)
+            sys.stdout.flush()
+
+    def status(self):
+        requests_made, reused, retried = self.transport.stats()
+        return {
+            "uptime": round(time.monotonic() - self.started, 3),
+            "conversions": self.conversions,
+            "failures": self.failures,
+            "hash_memory": {"entries": len(self.hash_memory), "max_entries": self.hash_memory.max_entries},
+            "purl_cache": self.converter.purl_engine.stats(),
+            "network": {"requests": requests_made, "reused_connections": reused, "retries": retried},
+        }
+
+    def close(self):
+        self.transport.close()
+        self.hasher.close()
+        if self._json_to_xlsx is not None:
+            self._json_to_xlsx.shutdown(wait=True)
+
+
+def companion_files(table_file):
+    """
+    Существующие таблицы зависимостей рядом с таблицей CSV/TSV (output.dependencies.csv).
+    """
+    base, extension = os.path.splitext(table_file)
+    return [base + suffix + extension for suffix in COMPANION_SUFFIXES if os.path.exists(base + suffix + extension)]
+
+
+def pack_tables(table_file, companions, zip_file):
+    """
+    Упаковывает таблицу CSV/TSV вместе с таблицами зависимостей в zip, чтобы в ответе
+    API граф зависимостей не терялся.
+    """
+    with zipfile.ZipFile(zip_file, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in [table_file, *companions]:
+            archive.write(path, os.path.basename(path))
+
+
+def unpack_tables(zip_file, table_file, max_size):
+    """
+    Извлекает из zip таблицу CSV/TSV (с расширением table_file) и ее таблицы зависимостей
+    под именами table_file и <имя>.dependencies<расширение> рядом с ним. Возвращает текст
+    ошибки или None.
+    """
+    base, extension = os.path.splitext(table_file)
+    with zipfile.ZipFile(zip_file) as archive:
+        # Суффикс имени ("" - основная таблица, ".dependencies" - зависимости) -> элементы архива
+        tables = {}
+        for member in archive.infolist():
+            name, member_extension = os.path.splitext(os.path.basename(member.filename))
+            if member.is_dir() or member_extension.lower() != extension:
+                continue
+            suffix = next((suffix for suffix in COMPANION_SUFFIXES if name.endswith(suffix)), "")
+            tables.setdefault(suffix, []).append(member)
+        if len(tables.get("", [])) != 1:
+            return f"В архиве должна быть одна таблица *{extension} (и таблицы зависимостей к ней)"
+        if any(len(members) > 1 for members in tables.values()):
+            return "В архиве несколько таблиц зависимостей"
+        if sum(members[0].file_size for members in tables.values()) > max_size:
+            return f"Размер таблиц в архиве превышает {max_size} байт"
+        for suffix, (member,) in tables.items():
+            with archive.open(member) as source, open(base + suffix + extension, "wb") as target:
+                shutil.copyfileobj(source, target, CHUNK_SIZE)
+    return None
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /xlsx-to-json?format=xlsx|csv|tsv - тело запроса: таблица, ответ: SBOM (с --gzip - .json.gz);
+    POST /json-to-xlsx?format=xlsx|csv|tsv - тело запроса: BOM, ответ: таблица;
+    GET /status - состояние сервиса и кэшей.
+    Таблица CSV/TSV с таблицей зависимостей передается в zip (output.csv, output.dependencies.csv):
+    так отвечает json-to-xlsx, если в BOM есть зависимости, и так же ее принимает xlsx-to-json.
+    Ошибка преобразования возвращается с кодом 422 и JSON {"error", "log"}.
+    """
+
+    server_version = "SbomTransfer"
+
+    def address_string(self):
+        # У клиентов Unix-сокета нет адреса
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def send_json(self, status, value):
+        body = json.dumps(value, ensure_ascii=False, indent=4).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlsplit(self.path).path != "/status":
+            self.send_json(404, {"error": "Неизвестный путь"})
+            return
+        self.send_json(200, self.server.service.status())
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        direction = url.path.strip("/")
+        if direction not in ("xlsx-to-json", "json-to-xlsx"):
+            self.send_json(404, {"error": "Неизвестный путь"})
+            return
+        table_format = parse_qs(url.query).get("format", ["xlsx"])[0]
+        if table_format not in TABLE_FORMATS:
+            self.send_json(400, {"error": f"Неизвестный формат таблицы: {table_format}"})
+            return
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            self.send_json(411, {"error": "Требуется заголовок Content-Length"})
+            return
+        length = int(length)
+        if length > self.server.max_body:
+            self.send_json(413, {"error": f"Размер файла превышает {self.server.max_body} байт"})
+            return
+
+        table_extension = f".{table_format}"
+        sbom_extension = ".json.gz" if self.server.service.options.gzip else ".json"
+        input_extension, output_extension = (
+            (table_extension, sbom_extension) if direction == "xlsx-to-json" else (".json", table_extension)
+        )
+        with tempfile.TemporaryDirectory(prefix="sbomtransfer-") as directory:
+            # Тело запроса и результат не держатся в памяти целиком
+            input_file = os.path.join(directory, "input" + input_extension)
+            with open(input_file, "wb") as f:
+                remaining = length
+                while remaining:
+                    chunk = self.rfile.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            if remaining:
+                self.send_json(400, {"error": "Тело запроса получено не полностью"})
+                return
+            if direction == "xlsx-to-json" and table_format != "xlsx" and zipfile.is_zipfile(input_file):
+                zip_file = os.path.join(directory, "input.zip")
+                os.replace(input_file, zip_file)
+                error = unpack_tables(zip_file, input_file, self.server.max_body)
+                if error:
+                    self.send_json(400, {"error": error})
+                    return
+            result = self.server.service.convert(direction, input_file, os.path.join(directory, "output" + output_extension))
+            if not result["ok"]:
+                self.send_json(422, {"error": result["error"], "log": result["log"]})
+                return
+            output_file = result["output"]
+            companions = companion_files(output_file) if direction == "json-to-xlsx" else []
+            if companions:
+                zip_file = os.path.join(directory, "output.zip")
+                pack_tables(output_file, companions, zip_file)
+                output_file = zip_file
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPES.get(os.path.splitext(output_file)[1], "application/octet-stream"))
+            self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(output_file)}"')
+            self.send_header("Content-Length", str(os.path.getsize(output_file)))
+            self.send_header("X-Conversion-Seconds", str(result["seconds"]))
+            self.end_headers()
+            with open(output_file, "rb") as f:
+                shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(service, host="127.0.0.1", port=None, socket_path=None, max_body=256 << 20):
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, RequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), RequestHandler)
+    server.service = service
+    server.max_body = max_body
+    return server
+
+
+class DirectoryWatcher:
+    """
+    Опрашивает каталог и пересоздает SBOM для таблиц, которые изменились. Таблица
+    преобразуется, когда ее размер и время изменения (вместе с таблицей зависимостей
+    рядом с CSV/TSV) не меняются между двумя опросами: Excel сохраняет файл в несколько
+    приемов. При запуске преобразуются таблицы, SBOM которых нет или старше таблицы.
+    """
+
+    def __init__(self, service, directory, output_dir=None, incremental=False):
+        self.service = service
+        self.directory = directory
+        self.output_dir = output_dir
+        self.incremental = incremental
+        self._done = {}
+        self._pending = {}
+
+    def output_path(self, table):
+        extension = ".json.gz" if self.service.options.gzip else ".json"
+        if self.output_dir:
+            return os.path.join(self.output_dir, os.path.splitext(os.path.basename(table))[0] + extension)
+        return os.path.splitext(table)[0] + extension
+
+    def tables(self):
+        """
+        Таблицы каталога -> подпись (размер и время изменения таблицы и ее таблиц зависимостей).
+        Временные файлы Excel (~$bom.xlsx) и LibreOffice (.~lock.bom.xlsx#) пропускаются.
+        """
+        stats = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                base, extension = os.path.splitext(entry.name)
+                if extension.lower() in (".xlsx", ".csv", ".tsv") and not entry.name.startswith(("~$", ".")) and entry.is_file():
+                    stat = entry.stat()
+                    stats[entry.path] = (base, extension, stat.st_mtime_ns, stat.st_size)
+        signatures = {}
+        for path, (base, extension, mtime, size) in stats.items():
+            if base.endswith(COMPANION_SUFFIXES):
+                continue
+            companions = tuple(
+                stats[companion][2:]
+                for companion in (os.path.join(self.directory, base + suffix + extension) for suffix in COMPANION_SUFFIXES)
+                if companion in stats
+            )
+            signatures[path] = ((mtime, size), companions)
+        return signatures
+
+    def is_stale(self, table):
+        try:
+            return os.path.getmtime(self.output_path(table)) < os.path.getmtime(table)
+        except OSError:
+            return True
+
+    def convert(self, table):
+        output_file = self.output_path(table)
+        extra_args = []
+        if self.incremental:
+            # Отпечатки строк пишутся и в первый SBOM, чтобы следующий запуск мог его использовать
+            extra_args.append("--emit-fingerprints")
+            if os.path.exists(output_file) and "--previous" not in self.service.converter_args:
+                extra_args += ["--previous", output_file]
+        self.service.report(self.service.convert("xlsx-to-json", table, output_file, extra_args))
+
+    def poll(self, first=False):
+        for table, signature in sorted(self.tables().items()):
+            if first:
+                if not self.is_stale(table):
+                    self._done[table] = signature
+                    continue
+            elif self._done.get(table) == signature:
+                continue
+            elif self._pending.get(table) != signature:
+                # Файл еще может дописываться: ждем следующего опроса
+                self._pending[table] = signature
+                continue
+            self._pending.pop(table, None)
+            self._done[table] = signature
+            self.convert(table)
+
+    def run(self, interval, stop=None):
+        stop = stop or threading.Event()
+        self.poll(first=True)
+        while not stop.wait(interval):
+            self.poll()
+
+
+def _terminate(signum, frame):
+    # Остановка по SIGTERM (systemd, docker stop) - как по Ctrl+C
+    raise KeyboardInterrupt
+
+
+def main():
+    args = parse_arguments()
+    signal.signal(signal.SIGTERM, _terminate)
+    service = ConversionService(args.converter_args, args.hash_memory_entries)
+    if args.watch and not os.path.isdir(args.watch):
+        print(f"Ошибка: Каталог '{args.watch}' не найден.")
+        exit(1)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    server = None
+    if args.port is not None or args.socket:
+        try:
+            server = create_server(service, args.host, args.port, args.socket, args.max_body_mb << 20)
+        except OSError as e:
+            print(f"Ошибка: Не удалось открыть {args.socket or f'{args.host}:{args.port}'}: {e}")
+            exit(1)
+        print(f"HTTP API: {args.socket or f'http://{args.host}:{server.server_address[1]}'}")
+
+    stop = threading.Event()
+    watcher_thread = None
+    if args.watch:
+        watcher = DirectoryWatcher(service, args.watch, args.output_dir, args.incremental)
+        print(f"Наблюдение за каталогом: {args.watch}")
+        watcher_thread = threading.Thread(target=watcher.run, args=(args.interval, stop), daemon=True)
+        watcher_thread.start()
+    sys.stdout.flush()
+
+    try:
+        if server is not None:
+            server.serve_forever()
+        else:
+            watcher_thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        if server is not None:
+            server.server_close()
+            if args.socket and os.path.exists(args.socket):
+                os.remove(args.socket)
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
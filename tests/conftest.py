@@ -0,0 +1,103 @@
+# tests/conftest.py
+
+"""
+Модули конвертеров импортируются по короткому имени, как в самих скриптах: каталог
+xlsx-to-json и каталог runner добавляются в sys.path. Сетевой код проверяется на локальном
+HTTP-сервере (фикстура http_server).
+"""
+
+import os
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for directory in ("xlsx-to-json", "runner"):
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик локального сервера: ответ на путь задает функция из server.routes,
+    которая получает обработчик; без функции - 404.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def handle_request(self, method):
+        self.server.hits[self.path] += 1
+        self.server.methods.append((method, self.path))
+        route = self.server.routes.get(self.path)
+        if route is None:
+            send_body(self, b"", status=404)
+        else:
+            route(self)
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_HEAD(self):
+        self.handle_request("HEAD")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def send_body(handler, body, status=200, cut=None, ranges=True):
+    """
+    Отправляет тело ответа. cut - число байт, после которых соединение закрывается
+    (Content-Length остается полным); ranges - поддерживать ли заголовок Range.
+    """
+    start = 0
+    requested = handler.headers.get("Range")
+    if ranges and requested and status == 200:
+        start = int(requested.split("=")[1].split("-")[0])
+        status = 206
+    handler.send_response(status)
+    handler.send_header("Content-Length", str(len(body) - start))
+    if status == 206:
+        handler.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+    handler.end_headers()
+    if handler.command == "HEAD":
+        return
+    if cut is None:
+        handler.wfile.write(body[start:])
+        return
+    handler.wfile.write(body[start:start + cut])
+    handler.wfile.flush()
+    handler.close_connection = True
+
+
+def start_server(port=0, routes=None):
+    """
+    Запускает локальный HTTP-сервер в отдельном потоке; port=0 - свободный порт.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+    server.daemon_threads = True
+    server.routes = {} if routes is None else routes
+    server.hits = Counter()
+    server.methods = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def http_server():
+    """
+    Локальный HTTP-сервер на свободном порту вместо реестров пакетов и сайтов.
+    """
+    server = start_server()
+    yield server
+    stop_server(server)
@@ -0,0 +1,26 @@
+# tests/test_incremental.py
+
+import gzip
+import json
+
+import pytest
+
+from incremental import FINGERPRINT_PROPERTY, load_previous_components
+
+SBOM = {
+    "components": [
+        {"name": "a", "properties": [{"name": FINGERPRINT_PROPERTY, "value": "f1"}]},
+        {"name": "b", "properties": [{"name": FINGERPRINT_PROPERTY, "value": "f1"}]},
+        {"name": "c"},
+    ]
+}
+
+
+@pytest.mark.parametrize("file_name, compressed", [("bom.json", False), ("bom.json.gz", True), ("bom.json", True)])
+def test_load_previous_components(tmp_path, file_name, compressed):
+    file_path = tmp_path / file_name
+    with (gzip.open if compressed else open)(file_path, "wt", encoding="utf-8") as f:
+        json.dump(SBOM, f)
+    index = load_previous_components(str(file_path))
+    assert list(index) == ["f1"]
+    assert [component["name"] for component in index["f1"]] == ["a", "b"]
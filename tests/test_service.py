@@ -0,0 +1,116 @@
+# tests/test_service.py
+
+import gzip
+import http.client
+import io
+import json
+import threading
+import zipfile
+
+import pytest
+
+from service import ConversionService, DirectoryWatcher, create_server
+
+TABLE = (
+    "Component,Version,Type,BOM Reference,PURL,attack_surface,security_function,externalReferences\n"
+    "lodash,4.17.21,library,r1,pkg:npm/lodash@4.17.21,no,no,https://github.com/lodash/lodash\n"
+    "left-pad,1.3.0,library,r2,pkg:npm/left-pad@1.3.0,no,no,\n"
+)
+
+
+@pytest.fixture
+def service():
+    service = ConversionService(["--gzip", "--no-cache"])
+    yield service
+    service.close()
+
+
+def test_watcher_incremental_gzip(tmp_path, service, capsys):
+    table = tmp_path / "bom.csv"
+    table.write_text(TABLE, encoding="utf-8")
+    watcher = DirectoryWatcher(service, str(tmp_path), incremental=True)
+    output_file = tmp_path / "bom.json.gz"
+    assert watcher.output_path(str(table)) == str(output_file)
+
+    watcher.convert(str(table))
+    watcher.convert(str(table))
+
+    assert service.failures == 0
+    assert "[ошибка]" not in capsys.readouterr().out
+    with gzip.open(output_file, "rt", encoding="utf-8") as f:
+        sbom = json.load(f)
+    assert [component["name"] for component in sbom["components"]] == ["lodash", "left-pad"]
+
+
+def test_watcher_incremental_reuses_rows(tmp_path, service):
+    table = tmp_path / "bom.csv"
+    table.write_text(TABLE, encoding="utf-8")
+    watcher = DirectoryWatcher(service, str(tmp_path), incremental=True)
+    watcher.convert(str(table))
+    result = service.convert("xlsx-to-json", str(table), watcher.output_path(str(table)),
+                             ["--emit-fingerprints", "--previous", watcher.output_path(str(table))])
+    assert result["ok"], result["error"]
+    assert "Строк из предыдущего SBOM: 2, пересчитано: 0" in result["log"]
+
+
+@pytest.fixture
+def server(service):
+    server = create_server(service, port=0)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, path, body):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=60)
+    try:
+        connection.request("POST", path, body)
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_api_gzip_response(server):
+    status, headers, body = post(server, "/xlsx-to-json?format=csv", TABLE.encode("utf-8"))
+    assert status == 200
+    assert headers["Content-Type"] == "application/gzip"
+    assert 'filename="output.json.gz"' in headers["Content-Disposition"]
+    assert [component["name"] for component in json.loads(gzip.decompress(body))["components"]] == ["lodash", "left-pad"]
+
+
+def test_api_csv_round_trip_keeps_dependencies(server):
+    bom = {
+        "bomFormat": "CycloneDX",
+        "specVersion": "1.6",
+        "components": [
+            {"type": "library", "bom-ref": "r1", "name": "a", "version": "1", "purl": "pkg:npm/a@1"},
+            {"type": "library", "bom-ref": "r2", "name": "b", "version": "2", "purl": "pkg:npm/b@2"},
+        ],
+        "dependencies": [{"ref": "r1", "dependsOn": ["r2"]}, {"ref": "r2", "dependsOn": []}],
+    }
+    status, headers, body = post(server, "/json-to-xlsx?format=csv", json.dumps(bom).encode("utf-8"))
+    assert status == 200
+    assert headers["Content-Type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert sorted(archive.namelist()) == ["output.csv", "output.dependencies.csv"]
+
+    status, headers, body = post(server, "/xlsx-to-json?format=csv", body)
+    assert status == 200
+    sbom = json.loads(gzip.decompress(body))
+    refs = {component["bom-ref"]: component["name"] for component in sbom["components"]}
+    edges = [(refs[entry["ref"]], refs[target]) for entry in sbom["dependencies"] for target in entry["dependsOn"]]
+    assert edges == [("a", "b")]
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/xlsx-to-json?format=csv", b"Component,Version\nlodash,4.17.21\n"),
+    ("/json-to-xlsx", b"{not json"),
+])
+def test_api_conversion_error(server, path, body):
+    # ConversionError обоих конвертеров - один класс из common/errors.py, и его текст уходит клиенту
+    status, _, body = post(server, path, body)
+    assert status == 422
+    error = json.loads(body)["error"]
+    assert error.startswith("Ошибка") and "Непредвиденная" not in error
@@ -0,0 +1,41 @@
+# tests/test_streebog.py
+
+"""
+Контрольные примеры ГОСТ Р 34.11-2012 (приложение А): сообщения M1 и M2, хэш 256 бит.
+Хэши записаны, как в стандарте и в выводе cpverify.
+"""
+
+import pytest
+
+from hashing import StreebogHasher, streebog_file
+from streebog import Streebog256
+
+M1 = b"012345678901234567890123456789012345678901234567890123456789012"
+M2 = "Се ветри, Стрибожи внуци, веютъ с моря стрелами на храбрыя плъкы Игоревы".encode("cp1251")
+H1 = "9D151EEFD8590B89DAA6BA6CB74AF9275DD051026BB149A452FD84E5E57B5500"
+H2 = "9DD2FE4E90409E5DA87F53976D7405B0C0CAC628FC669A741D50063C557E8F50"
+
+
+@pytest.mark.parametrize("message, expected", [(M1, H1), (M2, H2)])
+def test_control_examples(message, expected):
+    assert Streebog256(message).hexdigest().upper() == expected
+
+
+@pytest.mark.parametrize("message, expected", [(M1, H1), (M2, H2)])
+def test_update_in_parts(message, expected):
+    digest = Streebog256()
+    for offset in range(0, len(message), 7):
+        digest.update(message[offset:offset + 7])
+    assert digest.hexdigest().upper() == expected
+
+
+def test_hash_file_in_pool(tmp_path):
+    file_path = tmp_path / "m2.bin"
+    file_path.write_bytes(M2)
+    hasher = StreebogHasher(workers=2)
+    try:
+        assert not hasher.streaming
+        assert hasher.hash_file(str(file_path)) == H2
+    finally:
+        hasher.close()
+    assert streebog_file(str(file_path)) == H2
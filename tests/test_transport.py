@@ -0,0 +1,86 @@
+# tests/test_transport.py
+
+import pytest
+import requests
+
+from conftest import send_body
+from transport import Transport
+
+BODY = bytes(range(256)) * 1024
+
+
+@pytest.fixture
+def transport():
+    transport = Transport(per_host=2, retries=3, backoff=0, connect_timeout=5, read_timeout=5)
+    yield transport
+    transport.close()
+
+
+def download(transport, url):
+    return b"".join(transport.iter_content(url))
+
+
+def test_retry_on_5xx(http_server, transport):
+    def flaky(handler):
+        if http_server.hits["/flaky"] <= 2:
+            send_body(handler, b"", status=503)
+        else:
+            send_body(handler, BODY)
+
+    http_server.routes["/flaky"] = flaky
+    assert download(transport, http_server.url + "/flaky") == BODY
+    assert http_server.hits["/flaky"] == 3
+    assert transport.stats()[2] == 2
+
+
+def test_5xx_after_retries(http_server, transport):
+    http_server.routes["/down"] = lambda handler: send_body(handler, b"", status=503)
+    with pytest.raises(requests.HTTPError):
+        download(transport, http_server.url + "/down")
+    assert http_server.hits["/down"] == 4
+
+
+def test_retry_on_reset_before_response(http_server, transport):
+    def reset(handler):
+        if http_server.hits["/reset"] == 1:
+            handler.close_connection = True
+        else:
+            send_body(handler, BODY)
+
+    http_server.routes["/reset"] = reset
+    assert download(transport, http_server.url + "/reset") == BODY
+    assert http_server.hits["/reset"] == 2
+
+
+def test_resume_with_range(http_server, transport):
+    def cut(handler):
+        send_body(handler, BODY, cut=100000 if http_server.hits["/cut"] == 1 else None)
+
+    http_server.routes["/cut"] = cut
+    assert download(transport, http_server.url + "/cut") == BODY
+    assert http_server.hits["/cut"] == 2
+    assert transport.stats()[2] == 1
+
+
+def test_resume_without_range_support(http_server, transport):
+    def cut(handler):
+        send_body(handler, BODY, cut=100000 if http_server.hits["/cut"] == 1 else None, ranges=False)
+
+    http_server.routes["/cut"] = cut
+    assert download(transport, http_server.url + "/cut") == BODY
+    assert http_server.hits["/cut"] == 2
+
+
+def test_short_body_is_an_error(http_server, transport):
+    http_server.routes["/short"] = lambda handler: send_body(handler, BODY, cut=1000, ranges=False)
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        download(transport, http_server.url + "/short")
+    assert http_server.hits["/short"] == 1 + transport.retries
+
+
+def test_connections_are_reused(http_server, transport):
+    http_server.routes["/file"] = lambda handler: send_body(handler, BODY)
+    for _ in range(5):
+        assert download(transport, http_server.url + "/file") == BODY
+    requests_made, reused, retried = transport.stats()
+    assert (requests_made, reused, retried) == (5, 4, 0)
@@ -0,0 +1,126 @@
+# tests/test_url_check.py
+
+import socket
+import time
+
+import pytest
+
+from conftest import send_body, start_server, stop_server
+from transport import Transport
+from url_check import HOST_FAILURES, HostRateLimiter, UrlCheckCache, UrlVerifier
+
+
+class CountingTransport(Transport):
+    """
+    Транспорт, который считает проверочные запросы, в том числе к закрытому порту.
+    """
+
+    def __init__(self):
+        super().__init__(retries=0, backoff=0, connect_timeout=2, read_timeout=2)
+        self.checked = []
+
+    def status(self, url, method="HEAD"):
+        self.checked.append((method, url))
+        return super().status(url, method)
+
+
+@pytest.fixture
+def transport():
+    transport = CountingTransport()
+    yield transport
+    transport.close()
+
+
+def closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def verify(transport, urls, cache=None, rate=0.0):
+    components = [{"name": f"c{i}", "version": "1", "externalReferences": [{"type": "website", "url": url}]}
+                  for i, url in enumerate(urls)]
+    with UrlVerifier(transport, jobs=1, rate=rate, cache=cache) as verifier:
+        list(verifier.track(components))
+        return verifier.failures()
+
+
+def test_head_then_get(http_server, transport):
+    http_server.routes["/ok"] = lambda handler: send_body(handler, b"ok")
+    http_server.routes["/no-head"] = lambda handler: send_body(
+        handler, b"ok", status=405 if handler.command == "HEAD" else 200
+    )
+    failures = verify(transport, [http_server.url + "/ok", http_server.url + "/no-head", http_server.url + "/missing"])
+    assert [(url.rsplit("/", 1)[1], status) for _, url, status, _ in failures] == [("missing", 404)]
+    assert http_server.methods.count(("GET", "/ok")) == 0
+    assert http_server.methods.count(("GET", "/no-head")) == 1
+
+
+def test_host_cutoff_after_consecutive_failures(transport):
+    base = f"http://127.0.0.1:{closed_port()}"
+    urls = [f"{base}/{i}" for i in range(HOST_FAILURES + 3)]
+    failures = verify(transport, urls)
+    assert len(failures) == len(urls)
+    assert all(error == "ConnectionError" for _, _, _, error in failures)
+    # После HOST_FAILURES ошибок подряд хост больше не запрашивается
+    assert len(transport.checked) == HOST_FAILURES
+
+
+def test_server_response_resets_host_failures(http_server, transport):
+    port = http_server.server_address[1]
+    host = f"127.0.0.1:{port}"
+    stop_server(http_server)
+    verifier = UrlVerifier(transport, jobs=1, rate=0.0)
+    try:
+        for i in range(HOST_FAILURES - 1):
+            assert verifier._check(f"http://{host}/down{i}")[2] == "ConnectionError"
+        assert verifier._host_failures[host][0] == HOST_FAILURES - 1
+        # Сервер на том же порту снова отвечает: счетчик ошибок хоста сбрасывается
+        server = start_server(port, {"/ok": lambda handler: send_body(handler, b"ok")})
+        try:
+            assert verifier._check(f"http://{host}/ok") == (True, 200, None)
+        finally:
+            stop_server(server)
+        assert host not in verifier._host_failures
+        assert verifier._check(f"http://{host}/down")[2] == "ConnectionError"
+    finally:
+        verifier.close()
+
+
+def test_cache_ttl(http_server, transport, tmp_path):
+    http_server.routes["/ok"] = lambda handler: send_body(handler, b"ok")
+    url = http_server.url + "/ok"
+
+    cache = UrlCheckCache(str(tmp_path), ttl_hours=1)
+    verify(transport, [url], cache)
+    verify(transport, [url], cache)
+    cache.close()
+    assert http_server.hits["/ok"] == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Запись старше срока хранения не используется
+    expired = UrlCheckCache(str(tmp_path), ttl_hours=0)
+    verify(transport, [url], expired)
+    expired.close()
+    assert http_server.hits["/ok"] == 2
+    assert (expired.hits, expired.misses) == (0, 1)
+
+
+def test_network_errors_are_not_cached(transport, tmp_path):
+    url = f"http://127.0.0.1:{closed_port()}/"
+    cache = UrlCheckCache(str(tmp_path))
+    verify(transport, [url], cache)
+    verify(transport, [url], cache)
+    cache.close()
+    assert cache.hits == 0
+    assert len(transport.checked) == 2
+
+
+def test_rate_limit_per_host():
+    limiter = HostRateLimiter(20)
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.wait("http://a.example/x")
+    limiter.wait("http://b.example/x")
+    # Пять запросов к одному хосту - четыре интервала по 50 мс; другой хост не ждет
+    assert 0.19 <= time.monotonic() - started < 1.0
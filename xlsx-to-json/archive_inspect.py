@@ -0,0 +1,320 @@
+# xlsx-to-json/archive_inspect.py
+
+"""
+Разбор архива дистрибутива (tar.gz) за тот же проход, что и хэширование (--inspect-archives).
+Фрагменты загрузки передаются в хэши и одновременно читаются tarfile в потоковом режиме
+("r|gz"): архив не сохраняется на диск и не скачивается повторно. Из архива берутся манифест
+(package.json, *.nuspec, pom.xml; ближайший к корню) и файл лицензии, из них - объявленные
+имя, версия и лицензия, а также SHA-256 архива. Память на архив ограничена: данные идут
+фрагментами, заголовки tar не накапливаются, читаются только манифесты до MAX_MANIFEST_SIZE
+и начало файлов лицензий.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tarfile
+import time
+from functools import lru_cache
+from urllib.parse import unquote
+from xml.etree import ElementTree
+
+MAX_MANIFEST_SIZE = 1 << 20
+LICENSE_READ_SIZE = 64 << 10
+MANIFESTS = {"package.json": "npm", "pom.xml": "maven"}
+LICENSE_FILES = {"license", "license.txt", "license.md", "licence", "licence.txt", "licence.md", "copying", "copying.txt"}
+# Фразы, по которым текст файла лицензии однозначно относится к лицензии SPDX (первая подходящая)
+LICENSE_SIGNATURES = [
+    ("Apache-2.0", ("Apache License", "Version 2.0")),
+    ("MPL-2.0", ("Mozilla Public License", "2.0")),
+    ("MIT", ("Permission is hereby granted, free of charge",)),
+    ("ISC", ("Permission to use, copy, modify, and/or distribute this software for any purpose",)),
+    ("BSD-3-Clause", ("Redistribution and use in source and binary forms", "Neither the name")),
+    ("BSD-2-Clause", ("Redistribution and use in source and binary forms",)),
+    ("Unlicense", ("This is free and unencumbered software released into the public domain",)),
+    ("MIT", ("MIT License",)),
+]
+_EXPRESSION = re.compile(r"\s(?:OR|AND|WITH)\s")
+_SPDX_SCHEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema", "spdx.SNAPSHOT.schema.json")
+
+
+@lru_cache(maxsize=1)
+def spdx_ids():
+    """
+    Идентификаторы лицензий SPDX из схемы CycloneDX: строчное написание -> каноническое.
+    """
+    with open(_SPDX_SCHEMA, "r", encoding="utf-8") as f:
+        return {license_id.lower(): license_id for license_id in json.load(f)["enum"]}
+
+
+def classify_license(value):
+    """
+    Вид объявленной лицензии для CycloneDX: ("id", идентификатор SPDX), ("expression", выражение SPDX),
+    ("name", произвольное название) или None для пустого значения и ссылок npm "SEE LICENSE IN <файл>".
+    """
+    value = value.strip() if isinstance(value, str) else ""
+    if not value or value.upper().startswith("SEE LICENSE IN"):
+        return None
+    if _EXPRESSION.search(value):
+        return "expression", value
+    license_id = spdx_ids().get(value.strip("()").lower())
+    if license_id:
+        return "id", license_id
+    return "name", value
+
+
+def detect_license_text(data):
+    text = " ".join(data.decode("utf-8", "replace").split())
+    for license_id, phrases in LICENSE_SIGNATURES:
+        if all(phrase in text for phrase in phrases):
+            return license_id
+    return None
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child(element, name):
+    if element is not None:
+        for child in element:
+            if _local(child.tag) == name:
+                return child
+    return None
+
+
+def _text(element):
+    text = element.text.strip() if element is not None and element.text else ""
+    return text or None
+
+
+def parse_package_json(data):
+    manifest = json.loads(data.decode("utf-8-sig"))
+    licenses = manifest.get("license")
+    if isinstance(licenses, dict):
+        licenses = licenses.get("type")
+    if isinstance(licenses, str):
+        licenses = [licenses]
+    elif isinstance(manifest.get("licenses"), list):
+        # Устаревшая форма: "licenses": [{"type": "MIT", "url": ...}]
+        licenses = [item.get("type") if isinstance(item, dict) else item for item in manifest["licenses"]]
+    else:
+        licenses = []
+    return manifest.get("name"), manifest.get("version"), licenses
+
+
+def parse_nuspec(data):
+    metadata = _child(ElementTree.fromstring(data), "metadata")
+    licenses = []
+    license_element = _child(metadata, "license")
+    if license_element is not None and license_element.get("type") == "expression":
+        licenses.append(_text(license_element))
+    else:
+        # Устаревшая ссылка вида https://licenses.nuget.org/MIT содержит выражение SPDX
+        url = _text(_child(metadata, "licenseUrl")) or ""
+        if url.startswith("https://licenses.nuget.org/"):
+            licenses.append(unquote(url[len("https://licenses.nuget.org/"):]).strip("/"))
+    return _text(_child(metadata, "id")), _text(_child(metadata, "version")), licenses
+
+
+def parse_pom(data):
+    project = ElementTree.fromstring(data)
+    parent = _child(project, "parent")
+    group = _text(_child(project, "groupId")) or _text(_child(parent, "groupId"))
+    artifact = _text(_child(project, "artifactId"))
+    version = _text(_child(project, "version")) or _text(_child(parent, "version"))
+    if version and "${" in version:
+        # Значение из свойств сборки не вычисляется
+        version = None
+    licenses_element = _child(project, "licenses")
+    licenses = [_text(_child(item, "name")) for item in licenses_element] if licenses_element is not None else []
+    name = f"{group}:{artifact}" if group and artifact else artifact
+    return name, version, licenses
+
+
+PARSERS = {"npm": parse_package_json, "nuget": parse_nuspec, "maven": parse_pom}
+
+
+class ArchiveInfo:
+    """
+    Результат разбора архива: размер, SHA-256, путь манифеста в архиве, объявленные
+    имя, версия и лицензии (список пар из classify_license).
+    """
+
+    __slots__ = ("size", "sha256", "manifest", "name", "version", "licenses", "_depth", "_license_depth", "_license_text")
+
+    def __init__(self):
+        self.size = 0
+        self.sha256 = None
+        self.manifest = None
+        self.name = None
+        self.version = None
+        self.licenses = []
+        self._depth = None
+        self._license_depth = None
+        self._license_text = None
+
+    def wants(self, kind, depth):
+        """
+        Нужен ли файл: манифест и файл лицензии берутся ближайшие к корню архива.
+        """
+        current = self._license_depth if kind == "license" else self._depth
+        return current is None or depth < current
+
+    def add_manifest(self, kind, path, depth, data):
+        try:
+            name, version, licenses = PARSERS[kind](data)
+        except (ValueError, ElementTree.ParseError, AttributeError):
+            return
+        self.manifest = path
+        self.name = name if isinstance(name, str) else None
+        self.version = version if isinstance(version, str) else None
+        self.licenses = [choice for choice in map(classify_license, licenses) if choice]
+        self._depth = depth
+
+    def add_license_file(self, depth, data):
+        license_id = detect_license_text(data)
+        if license_id:
+            self._license_text = license_id
+            self._license_depth = depth
+
+    def finish(self):
+        # Лицензия из файла используется, только если манифест ее не объявляет
+        if not self.licenses and self._license_text:
+            self.licenses = [("id", self._license_text)]
+
+    def to_json(self):
+        """
+        Результат разбора строкой JSON - для записи в кэш хэшей рядом с хэшем архива.
+        """
+        return json.dumps({
+            "size": self.size, "sha256": self.sha256, "manifest": self.manifest,
+            "name": self.name, "version": self.version, "licenses": self.licenses,
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text):
+        """
+        Восстанавливает результат разбора из строки to_json или возвращает None для поврежденной записи.
+        """
+        try:
+            data = json.loads(text)
+            info = cls()
+            info.size = data["size"]
+            info.sha256 = data["sha256"]
+            info.manifest = data["manifest"]
+            info.name = data["name"]
+            info.version = data["version"]
+            info.licenses = [(kind, value) for kind, value in data["licenses"]]
+        except (ValueError, KeyError, TypeError):
+            return None
+        return info
+
+
+class _TeeReader:
+    """
+    Файловый объект для tarfile поверх итератора фрагментов загрузки: каждый фрагмент
+    при получении передается в sinks (update хэшей, write файла) и в SHA-256.
+    """
+
+    def __init__(self, chunks, sinks):
+        self._chunks = iter(chunks)
+        self._sinks = list(sinks)
+        self._buffer = bytearray()
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.sink_seconds = 0.0
+        self.error = None
+
+    def _next(self):
+        try:
+            chunk = next(self._chunks, b"")
+        except Exception as e:
+            # Ошибка загрузки, а не формата архива
+            self.error = e
+            raise
+        if chunk:
+            started = time.thread_time()
+            self.sha256.update(chunk)
+            for sink in self._sinks:
+                sink(chunk)
+            self.sink_seconds += time.thread_time() - started
+            self.size += len(chunk)
+        return chunk
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = self._next()
+            if not chunk:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def drain(self):
+        self._buffer.clear()
+        while self._next():
+            pass
+
+
+def _file_kind(path):
+    name = path.rsplit("/", 1)[-1].lower()
+    if name in MANIFESTS:
+        return MANIFESTS[name]
+    if name.endswith(".nuspec"):
+        return "nuget"
+    if name in LICENSE_FILES:
+        return "license"
+    return None
+
+
+def _read_members(reader, info):
+    with tarfile.open(fileobj=reader, mode="r|gz") as archive:
+        while True:
+            member = archive.next()
+            if member is None:
+                break
+            # В потоковом режиме tarfile хранит заголовки всех прочитанных файлов
+            archive.members.clear()
+            if not member.isfile():
+                continue
+            kind = _file_kind(member.name)
+            if kind is None:
+                continue
+            path = member.name
+            while path.startswith("./"):
+                path = path[2:]
+            path = path.lstrip("/")
+            depth = path.count("/")
+            if not info.wants(kind, depth):
+                continue
+            if kind == "license":
+                info.add_license_file(depth, archive.extractfile(member).read(LICENSE_READ_SIZE))
+            elif member.size <= MAX_MANIFEST_SIZE:
+                info.add_manifest(kind, path, depth, archive.extractfile(member).read())
+
+
+def inspect_archive(chunks, sinks=()):
+    """
+    Читает архив из итератора фрагментов за один проход и возвращает пару (ArchiveInfo,
+    время в sinks и SHA-256 в секундах).
+    Все фрагменты, включая данные после конца tar, передаются в sinks и SHA-256.
+    Ошибка загрузки выбрасывается; если данные не являются tar.gz, метаданные остаются
+    пустыми, а размер и SHA-256 заполняются.
+    """
+    reader = _TeeReader(chunks, sinks)
+    info = ArchiveInfo()
+    try:
+        _read_members(reader, info)
+    except Exception:
+        if reader.error is not None:
+            raise reader.error
+    reader.drain()
+    info.finish()
+    info.size = reader.size
+    info.sha256 = reader.sha256.hexdigest()
+    return info, reader.sink_seconds
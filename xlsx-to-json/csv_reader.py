@@ -0,0 +1,87 @@
+# xlsx-to-json/csv_reader.py
+
+"""
+Потоковое чтение таблиц CSV/TSV с тем же интерфейсом, что и у xlsx_reader:
+книга из одного листа, строки которого выдаются по одной.
+"""
+
+import csv
+import os
+
+# Расширение входного файла -> разделитель полей
+DELIMITERS = {".csv": ",", ".tsv": "\t"}
+# Дополнительные таблицы, которые json-to-xlsx пишет рядом с основной (bom.dependencies.csv)
+COMPANION_TABLES = ("Dependencies",)
+
+
+def table_delimiter(file_path):
+    """
+    Разделитель полей для файла CSV/TSV или None для остальных форматов (xlsx).
+    """
+    return DELIMITERS.get(os.path.splitext(file_path)[1].lower())
+
+
+def companion_path(file_path, name):
+    """
+    Путь к дополнительной таблице рядом с основной: bom.csv, "Dependencies" -> bom.dependencies.csv.
+    """
+    base, extension = os.path.splitext(file_path)
+    return f"{base}.{name.lower()}{extension}"
+
+
+class CsvWorkbook:
+    """
+    Файл CSV/TSV как книга: первый лист - сам файл (с именем файла без расширения),
+    следующие - дополнительные таблицы рядом с ним, если они есть.
+    Кодировка - UTF-8, с BOM или без.
+    """
+
+    def __init__(self, file_path, delimiter=","):
+        self.file_path = file_path
+        self.delimiter = delimiter
+        # Проверка наличия файла при открытии, как у xlsx
+        with open(file_path, "rb"):
+            pass
+        paths = [file_path] + [companion_path(file_path, name) for name in COMPANION_TABLES]
+        self.worksheets = [
+            CsvSheet(self, os.path.splitext(os.path.basename(path))[0], path)
+            for index, path in enumerate(paths)
+            if index == 0 or os.path.exists(path)
+        ]
+
+    @property
+    def sheetnames(self):
+        return [sheet.title for sheet in self.worksheets]
+
+    def __getitem__(self, name):
+        for sheet in self.worksheets:
+            if sheet.title == name:
+                return sheet
+        raise KeyError(name)
+
+    def close(self):
+        pass
+
+
+class CsvSheet:
+
+    def __init__(self, workbook, title, file_path):
+        self.workbook = workbook
+        self.title = title
+        self.file_path = file_path
+
+    def iter_rows(self, columns=None):
+        """
+        Выдает (номер строки, словарь {номер колонки с 0: значение}) для непустых строк,
+        как Worksheet.iter_rows в xlsx_reader. Пустые поля пропускаются, как пустые ячейки.
+        Номер строки - номер последней строки файла, занятой записью.
+        """
+        with open(self.file_path, encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f, delimiter=self.workbook.delimiter)
+            for row in reader:
+                if columns is None:
+                    cells = {index: value for index, value in enumerate(row) if value}
+                else:
+                    cells = {index: row[index] for index in columns if index < len(row) and row[index]}
+                if cells:
+                    yield reader.line_num, cells
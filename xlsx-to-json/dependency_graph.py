@@ -0,0 +1,164 @@
+# xlsx-to-json/dependency_graph.py
+
+"""
+Восстановление графа зависимостей из таблицы ребер "ref -> dependsOn", которую пишет
+json-to-xlsx (листы Dependencies1, ... в xlsx, файл <имя>.dependencies.csv рядом с CSV/TSV).
+Концы ребер разрешаются через хэш-таблицы bom-ref, PURL и name@version компонентов нового
+SBOM, поэтому время линейно по числу ребер. Компоненты строк без BOM Reference получают новый
+bom-ref (uuid4), и ребра, записанные через их PURL или имя и версию, переводятся на него;
+если в таблице ребер ссылка на bom-ref устарела, конец ищется по колонкам refPurl/dependsOnPurl.
+"""
+
+DEPENDENCY_COLUMNS = ["ref", "dependsOn"]
+# Необязательные колонки с PURL (или name@version) концов ребра, их пишет json-to-xlsx
+DEPENDENCY_KEY_COLUMNS = ["refPurl", "dependsOnPurl"]
+# Обозначение корневого компонента SBOM (metadata.component) в таблице ребер
+ROOT_REF = "metadata.component"
+# Сколько ребер с неизвестными bom-ref запоминается для вывода
+DANGLING_EXAMPLES = 20
+
+
+def is_dependency_header(header):
+    return all(column in header for column in DEPENDENCY_COLUMNS)
+
+
+def dependency_indexes(header):
+    """
+    Номера колонок таблицы ребер: ref, dependsOn и, если есть обе, refPurl и dependsOnPurl.
+    """
+    columns = DEPENDENCY_COLUMNS
+    if all(column in header for column in DEPENDENCY_KEY_COLUMNS):
+        columns = columns + DEPENDENCY_KEY_COLUMNS
+    return [header.index(column) for column in columns]
+
+
+def _fields(component):
+    """
+    (bom-ref, PURL, name@version) компонента модели или компонента из предыдущего SBOM (словаря).
+    """
+    if isinstance(component, dict):
+        return component.get("bom-ref"), component.get("purl"), f"{component.get('name')}@{component.get('version')}"
+    return component.bom_ref, component.purl, f"{component.name}@{component.version}"
+
+
+class RefIndex:
+    """
+    Таблицы для поиска итогового bom-ref компонента по ссылке из таблицы ребер: сначала
+    по bom-ref, затем по PURL (итоговому или из колонки PURL строки), затем по name@version.
+    При повторах выигрывает первый компонент.
+    """
+
+    def __init__(self, root_ref=None):
+        self._refs = {}
+        self._purls = {}
+        self._names = {}
+        # PURL из строк таблицы, компоненты которых еще не собраны: место строки -> PURL
+        self._row_purls = {}
+        if root_ref is not None:
+            self._refs[ROOT_REF] = root_ref
+            self._refs[root_ref] = root_ref
+
+    def add(self, component, row_purl=None):
+        bom_ref, purl, name = _fields(component)
+        if bom_ref is None:
+            return
+        self._refs.setdefault(bom_ref, bom_ref)
+        for key in (purl, row_purl):
+            if key:
+                self._purls.setdefault(key, bom_ref)
+        self._names.setdefault(name, bom_ref)
+
+    def track_rows(self, rows, purl):
+        """
+        Пропускает пары (место строки, строка) дальше без изменений, запоминая PURL строки
+        (функция purl) до сборки ее компонента: итоговый PURL компонента может быть другим.
+        """
+        for location, values in rows:
+            self._row_purls[location] = purl(values)
+            yield location, values
+
+    def track(self, located_components):
+        """
+        Пропускает пары (место строки, компонент) дальше без изменений, добавляя компоненты в индекс.
+        """
+        for location, component in located_components:
+            self.add(component, self._row_purls.pop(location, None))
+            yield location, component
+
+    def _lookup(self, key):
+        if key is None:
+            return None
+        return self._refs.get(key) or self._purls.get(key) or self._names.get(key)
+
+    def resolve(self, key, fallback=None):
+        """
+        Итоговый bom-ref по ссылке key, а если она не найдена - по запасному ключу fallback.
+        """
+        return self._lookup(key) or self._lookup(fallback)
+
+
+class DependencyGraph:
+    """
+    Ребра графа по итоговым bom-ref: для каждого компонента - его зависимости в порядке
+    первого появления, без повторов. Ребра, конец которых не найден, отбрасываются и
+    учитываются в dangling.
+    """
+
+    def __init__(self, index):
+        self._index = index
+        self._edges = {}
+        self.edges = 0
+        self.dangling = 0
+        self.dangling_examples = []
+
+    def _dangling(self, location, key):
+        self.dangling += 1
+        if len(self.dangling_examples) < DANGLING_EXAMPLES:
+            self.dangling_examples.append((location, key))
+
+    def add(self, location, source, target=None, source_key=None, target_key=None):
+        """
+        Добавляет ребро source -> target (target None - строка без зависимости). source_key и
+        target_key - PURL или name@version концов, по ним ищутся ссылки на устаревшие bom-ref.
+        """
+        source_ref = self._index.resolve(source, source_key)
+        if source_ref is None:
+            self._dangling(location, source)
+            return
+        if target is None:
+            return
+        target_ref = self._index.resolve(target, target_key)
+        if target_ref is None:
+            self._dangling(location, target)
+            return
+        targets = self._edges.setdefault(source_ref, {})
+        if target_ref not in targets:
+            targets[target_ref] = None
+            self.edges += 1
+
+    def depends_on(self, ref):
+        return list(self._edges.get(ref, ()))
+
+    def entries(self, refs, root_ref=None):
+        """
+        Элементы раздела dependencies: корневой компонент (если у него есть ребра),
+        затем компоненты в порядке refs. Зависимости, которых нет среди refs и корневого
+        компонента, не выдаются и учитываются в dangling, чтобы граф ссылался только на
+        записанные компоненты.
+        """
+        known = set(refs)
+        if root_ref is not None:
+            known.add(root_ref)
+
+        def depends_on(ref):
+            targets = self.depends_on(ref)
+            missing = [target for target in targets if target not in known]
+            for target in missing:
+                self._dangling(None, target)
+                self.edges -= 1
+            return [target for target in targets if target in known] if missing else targets
+
+        if root_ref is not None and root_ref in self._edges:
+            yield {"ref": root_ref, "dependsOn": depends_on(root_ref)}
+        for ref in refs:
+            yield {"ref": ref, "dependsOn": depends_on(ref)}
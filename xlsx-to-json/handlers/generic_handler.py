@@ -1,11 +1,11 @@
 # handlers/generic_handler.py
 
-import pandas as pd
+from util import is_missing
 
 from urllib.parse import urlparse
 
 def convert_generic_purl(purl):
-    if pd.isna(purl):
+    if is_missing(purl):
         return None
 
     if purl.startswith("https://github.com/") and "archive" in purl:
@@ -32,3 +32,4 @@ def convert_generic_purl(purl):
 
     return None
 
+PURL_TYPES = {"generic": convert_generic_purl}
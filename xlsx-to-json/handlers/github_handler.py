@@ -12,3 +12,4 @@ def handle_github_purl(purl):
     except Exception:
         return None
 
+URL_PREFIXES = {"https://github.com/": handle_github_purl}
@@ -0,0 +1,18 @@
+# handlers/maven_handler.py
+
+from handlers.generic_handler import convert_generic_purl
+
+def handle_maven_purl(purl):
+    try:
+        _, _, maven_part = purl.partition("pkg:maven/")
+        group_and_artifact, _, version = maven_part.partition("@")
+        if group_and_artifact and version:
+            group, _, artifact = group_and_artifact.rpartition("/")
+            if group and artifact:
+                return f"pkg:maven/{group}/{artifact}@{version}"
+    except Exception:
+        return None
+    # PURL без группы или версии разбирается как generic
+    return convert_generic_purl(purl)
+
+PURL_TYPES = {"maven": handle_maven_purl}
@@ -34,3 +34,4 @@ def npm_purl_to_website(purl):
     except Exception:
         return None
 
+PURL_TYPES = {"npm": handle_npm_purl}
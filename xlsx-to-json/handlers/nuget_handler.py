@@ -1,9 +1,9 @@
 # handlers/nuget_handler.py
 
-import pandas as pd
+from util import is_missing
 
 def handle_nuget_purl(purl, component_name=None, version=None):
-    if pd.isna(purl) and component_name and version:
+    if is_missing(purl) and component_name and version:
         return f"pkg:nuget/{component_name}@{version}"
     
     try:
@@ -29,3 +29,5 @@ def generate_nuget_external_reference(component_name, version):
         return f"https://www.nuget.org/packages/{component_name}/{version}"
     return None
 
+PURL_TYPES = {"nuget": handle_nuget_purl}
+URL_PREFIXES = {"https://www.nuget.org/packages/": nuget_url_to_purl}
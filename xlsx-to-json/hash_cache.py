@@ -0,0 +1,168 @@
+# xlsx-to-json/hash_cache.py
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sbomtransfer")
+
+
+class HashMemory:
+    """
+    Ограниченный LRU-кэш записей HashCache в памяти: (URL, алгоритм) -> (валидаторы, хэш).
+    Живет дольше одного HashCache (например, в резидентном сервисе), поэтому повторные
+    преобразования находят хэши без обращения к базе. При превышении max_entries
+    вытесняются давно не использованные записи.
+    """
+
+    def __init__(self, max_entries=65536):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class HashCache:
+    """
+    Постоянный кэш хэшей архивов дистрибутивов в SQLite.
+    Запись считается действительной, пока совпадают URL, алгоритм и валидаторы
+    ответа сервера (размер, ETag, Last-Modified). Устаревшие записи удаляются
+    по возрасту, а при превышении лимита - по давности последнего использования.
+    С memory (HashMemory) найденные и сохраненные записи дублируются в памяти;
+    время использования записей, найденных в памяти, записывается в базу при close().
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_age_days=30, max_entries=50000, refresh=False, memory=None):
+        self.directory = directory
+        self.path = os.path.join(directory, "hashes.sqlite3")
+        self.max_age = max_age_days * 86400
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self.memory = memory
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._touched = set()
+
+    def _connection(self):
+        """
+        Открывает базу при первом обращении: преобразование без ссылок на архивы
+        не создает и не чистит файл кэша. Вызывается под self._lock.
+        """
+        if self._conn is not None:
+            return self._conn
+        os.makedirs(self.directory, exist_ok=True)
+        # Кэш может быть открыт одновременно несколькими процессами пакетного режима:
+        # WAL не блокирует чтение во время записи, а timeout дает дождаться чужой транзакции
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            " url TEXT NOT NULL,"
+            " alg TEXT NOT NULL,"
+            " size TEXT NOT NULL,"
+            " etag TEXT NOT NULL,"
+            " last_modified TEXT NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (url, alg))"
+        )
+        self._conn.commit()
+        return self._conn
+
+    def lookup(self, url, alg, validators):
+        """
+        Возвращает сохраненный хэш или None, если записи нет, валидаторы неизвестны
+        или сервер отдает другой файл.
+        """
+        with self._lock:
+            if validators and self.memory is not None and not self.refresh:
+                entry = self.memory.get((url, alg))
+                if entry is not None and entry[0] == tuple(validators):
+                    self._touched.add((url, alg))
+                    self.hits += 1
+                    return entry[1]
+            if validators and not self.refresh:
+                row = self._connection().execute(
+                    "SELECT size, etag, last_modified, digest FROM hashes WHERE url = ? AND alg = ?",
+                    (url, alg)
+                ).fetchone()
+                if row and tuple(row[:3]) == tuple(validators):
+                    self._conn.execute(
+                        "UPDATE hashes SET last_used = ? WHERE url = ? AND alg = ?",
+                        (time.time(), url, alg)
+                    )
+                    self._conn.commit()
+                    if self.memory is not None:
+                        self.memory.put((url, alg), (tuple(validators), row[3]))
+                    self.hits += 1
+                    return row[3]
+            self.misses += 1
+            return None
+
+    def store(self, url, alg, validators, digest):
+        now = time.time()
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, alg, *validators, digest, now, now)
+            )
+            self._conn.commit()
+            if self.memory is not None:
+                self.memory.put((url, alg), (tuple(validators), digest))
+
+    def close(self):
+        """
+        Удаляет устаревшие записи и закрывает базу.
+        """
+        with self._lock:
+            if self._touched:
+                self._connection().executemany(
+                    "UPDATE hashes SET last_used = ? WHERE url = ? AND alg = ?",
+                    [(time.time(), url, alg) for url, alg in self._touched]
+                )
+                self._touched.clear()
+            if self._conn is None:
+                return
+            self._conn.execute("DELETE FROM hashes WHERE last_used < ?", (time.time() - self.max_age,))
+            self._conn.execute(
+                "DELETE FROM hashes WHERE rowid NOT IN"
+                " (SELECT rowid FROM hashes ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+
+def response_validators(headers):
+    """
+    Возвращает кортеж (размер, ETag, Last-Modified) из заголовков ответа
+    или None, если сервер не сообщает ни одного из них.
+    """
+    validators = (
+        headers.get("Content-Length", ""),
+        headers.get("ETag", ""),
+        headers.get("Last-Modified", "")
+    )
+    return validators if any(validators) else None
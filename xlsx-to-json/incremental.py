@@ -0,0 +1,69 @@
+# xlsx-to-json/incremental.py
+
+import gzip
+import hashlib
+import json
+from collections import defaultdict, deque
+
+FINGERPRINT_PROPERTY = "SbomTransfer:row_fingerprint"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def row_fingerprint(values):
+    """
+    Отпечаток исходной строки таблицы: SHA-256 от значений обязательных колонок.
+    Пустые ячейки учитываются как пустые строки.
+    """
+    text = "\x1f".join("" if value is None or value != value else str(value) for value in values)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def component_fingerprint(component):
+    for prop in component.get("properties", []):
+        if prop.get("name") == FINGERPRINT_PROPERTY:
+            return prop.get("value")
+    return None
+
+
+def load_previous_components(file_path):
+    """
+    Читает SBOM предыдущего запуска и индексирует его компоненты по отпечатку строки.
+    Одинаковые строки таблицы дают несколько компонентов с одним отпечатком,
+    они выдаются по очереди в исходном порядке. SBOM, сжатый gzip (--gzip), определяется
+    по первым байтам файла, а не по расширению.
+    """
+    with open(file_path, 'rb') as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    with (gzip.open if compressed else open)(file_path, 'rt', encoding='utf-8') as f:
+        sbom = json.load(f)
+    index = defaultdict(deque)
+    for component in sbom.get("components", []):
+        fingerprint = component_fingerprint(component)
+        if fingerprint:
+            index[fingerprint].append(component)
+    return index
+
+
+def has_distribution_hashes(component, urls):
+    """
+    Есть ли у компонента предыдущего SBOM хэши всех архивов строки: при неудачной загрузке
+    или расчете хэша ссылка source-distribution с хэшами отсутствует.
+    """
+    hashed = {
+        reference.get("url")
+        for reference in component.get("externalReferences", [])
+        if reference.get("type") == "source-distribution" and reference.get("hashes")
+    }
+    return all(url in hashed for url in urls)
+
+
+def take_previous(index, fingerprint, distribution_urls=()):
+    """
+    Извлекает из индекса очередной компонент предыдущего SBOM с тем же отпечатком или возвращает None.
+    Компонент без хэшей архивов строки (distribution_urls) не используется: строка пересчитывается.
+    """
+    components = index.get(fingerprint)
+    if not components:
+        return None
+    component = components.popleft()
+    return component if has_distribution_hashes(component, distribution_urls) else None
@@ -1,100 +1,363 @@
 # xlsx-to-json/main.py
 
 import argparse
-import json
-import pandas as pd
+import csv
 import os
-import requests
-import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import nullcontext
+from functools import partial
 from uuid import uuid4
 from datetime import datetime
 from urllib.parse import urlparse
 
-from handlers.github_handler import handle_github_purl
-from handlers.nuget_handler import handle_nuget_purl, nuget_url_to_purl, generate_nuget_external_reference
-from handlers.npm_handler import handle_npm_purl, npm_purl_to_website
-from handlers.generic_handler import convert_generic_purl
+from handlers.nuget_handler import generate_nuget_external_reference
+from purl_engine import PurlEngine, purl_type
+from pipeline import is_distribution_url, collect_distribution_urls, DistributionPrefetcher, iter_in_order
+from hash_cache import HashCache, DEFAULT_CACHE_DIR, response_validators
+from hashing import StreebogHasher, CpverifyHasher, DEFAULT_CPVERIFY_PATH, cpverify_available
+from transport import Transport
+from incremental import FINGERPRINT_PROPERTY, row_fingerprint, load_previous_components, take_previous
+from metrics import Metrics, format_report, save_report
+from references import ReferenceSet
+from model import Component, Hash, License, Property, component_ref, license_choice
+from sbom_writer import SbomWriter
+from xlsx_reader import open_workbook, select_sheets, read_header, iter_sheet_rows
+from util import is_missing
+from csv_reader import CsvWorkbook, table_delimiter
+from url_check import DEFAULT_RATE, UrlCheckCache, UrlVerifier
+from dependency_graph import RefIndex, DependencyGraph, dependency_indexes, is_dependency_header
+
+# ConversionError общий с json-to-xlsx и runner (каталог common рядом с каталогом конвертера)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from errors import ConversionError  # noqa: E402
+
+HASH_ALG = "STREEBOG-256"
+# Запись кэша хэшей с результатом разбора архива (--inspect-archives)
+ARCHIVE_INFO_ALG = "ARCHIVE-INFO"
+# Второй хэш архива, рассчитываемый при --inspect-archives
+SECOND_HASH_ALG = "SHA-256"
+# Свойства компонента с данными манифеста архива (--inspect-archives)
+DECLARED_PROPERTIES = (
+    ("SbomTransfer:declared_name", "name"),
+    ("SbomTransfer:declared_version", "version"),
+    ("SbomTransfer:declared_manifest", "manifest"),
+)
+# Число прочитанных строк, которые могут ждать загрузки архивов, прежде чем чтение приостановится
+PREFETCH_WINDOW = 10000
+REQUIRED_COLUMNS = ["Component", "Version", "Type", "BOM Reference", "PURL", "attack_surface", "security_function", "externalReferences"]
+
+purl_engine = PurlEngine()
+metrics = Metrics()
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Генерация SBOM файла из Excel таблицы")
+    parser.add_argument("-i", "--input", required=True, help="Путь к входной таблице: xlsx, CSV или TSV (например, bom.xlsx)")
+    parser.add_argument("--verify-urls", action="store_true", help="Проверить доступность ссылок website и vcs компонентов")
+    parser.add_argument("--verify-rate", type=float, default=DEFAULT_RATE,
+                        help=f"Число проверочных запросов в секунду к одному хосту (по умолчанию {DEFAULT_RATE:g}; "
+                             "0 - без ограничения, одновременных запросов к хосту не больше --per-host)")
+    parser.add_argument("--verify-ttl", type=float, default=24, help="Срок хранения результатов проверки ссылок в часах (по умолчанию 24)")
+    parser.add_argument("--validate", action="store_true", help="Проверить компоненты по схеме CycloneDX 1.6")
+    parser.add_argument("-o", "--output", help="Путь к выходному JSON-файлу (по умолчанию рядом с входным, с расширением .json)")
+    parser.add_argument("--sheet", action="append",
+                        help="Имя листа для чтения; можно указать несколько раз (по умолчанию первый лист и следующие "
+                             "за ним листы с тем же заголовком)")
+    parser.add_argument("--all-sheets", action="store_true", help="Читать все листы книги как одну таблицу; листы без обязательных столбцов пропускаются")
+    parser.add_argument("-j", "--jobs", type=int, default=8, help="Число параллельных загрузок и расчетов хэша (по умолчанию 8)")
+    parser.add_argument("--hasher", choices=["auto", "streebog", "cpverify"], default="auto",
+                        help="Способ расчета хэша ГОСТ Р 34.11-2012: утилитой cpverify, встроенный (streebog) или "
+                             "auto - cpverify, если утилита установлена, иначе встроенный (по умолчанию auto)")
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 1,
+                        help="Число процессов встроенного хэшера (по умолчанию по числу ядер; 1 - хэширование "
+                             "в потоке загрузки, без временных файлов)")
+    parser.add_argument("--cpverify-path", default=DEFAULT_CPVERIFY_PATH, help=f"Путь к утилите cpverify (по умолчанию {DEFAULT_CPVERIFY_PATH})")
+    parser.add_argument("--cpverify-batch", type=int, default=1, help="Максимальное число файлов в одном вызове cpverify (по умолчанию 1)")
+    parser.add_argument("--per-host", type=int, default=4, help="Максимальное число одновременных соединений с одним хостом (по умолчанию 4)")
+    parser.add_argument("--retries", type=int, default=3, help="Число повторов при ошибках 5xx и обрывах соединения (по умолчанию 3)")
+    parser.add_argument("--connect-timeout", type=float, default=10, help="Таймаут подключения в секундах (по умолчанию 10)")
+    parser.add_argument("--read-timeout", type=float, default=60, help="Таймаут чтения в секундах (по умолчанию 60)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"Каталог кэша хэшей (по умолчанию {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-age", type=int, default=30, help="Срок хранения неиспользуемых записей кэша в днях (по умолчанию 30)")
+    parser.add_argument("--cache-max-entries", type=int, default=50000, help="Максимальное число записей кэша (по умолчанию 50000)")
+    parser.add_argument("--no-cache", action="store_true", help="Не использовать кэш хэшей")
+    parser.add_argument("--refresh", action="store_true", help="Пересчитать все хэши и обновить кэш")
+    parser.add_argument("--inspect-archives", action="store_true",
+                        help="Разбирать архивы tar.gz при скачивании: объявленные имя, версия, лицензия и хэш SHA-256")
+    parser.add_argument("--previous", help="SBOM предыдущего запуска: компоненты неизмененных строк берутся из него без пересчета")
+    parser.add_argument("--emit-fingerprints", action="store_true",
+                        help="Записать отпечатки строк таблицы для последующих запусков с --previous (включается вместе с --previous)")
+    parser.add_argument("--compact", action="store_true", help="Записать JSON без отступов и пробелов")
+    parser.add_argument("--gzip", action="store_true", help="Сжать результат gzip (по умолчанию при имени выходного файла *.gz)")
+    parser.add_argument("--profile", action="store_true", help="Вывести время этапов, счетчики и самые медленные загрузки")
+    parser.add_argument("--metrics-json", help="Сохранить метрики преобразования в JSON-файл")
+    parser.add_argument("--cprofile", help="Выполнить преобразование под cProfile и сохранить статистику (pstats) в файл")
+    return parser.parse_args(argv)
+
+
+def read_input_file(file_path, sheet_names=None, all_sheets=False):
+    """
+    Открывает книгу в потоковом режиме и проверяет заголовки выбранных листов.
+    Файлы .csv и .tsv читаются как книга из одного листа (и таблицы зависимостей рядом с ним).
+    Возвращает книгу, список (лист, номер строки заголовка, номера обязательных колонок)
+    и такой же список листов с ребрами графа зависимостей (колонки ref и dependsOn);
+    строки читаются позже.
+    """
+    delimiter = table_delimiter(file_path)
+    try:
+        workbook = CsvWorkbook(file_path, delimiter) if delimiter else open_workbook(file_path)
+    except FileNotFoundError:
+        raise ConversionError(f"Ошибка: Файл '{file_path}' не найден.")
+    except Exception as e:
+        raise ConversionError(f"Ошибка при чтении Excel файла: {e}")
+    try:
+        headers = {sheet.title: read_header(sheet) for sheet in workbook.worksheets}
+        dependency_sheets = [
+            (sheet, header_row, dependency_indexes(header))
+            for sheet in workbook.worksheets
+            for header_row, header in [headers[sheet.title]]
+            if is_dependency_header(header)
+        ]
+        selected = select_sheets(workbook, sheet_names, all_sheets, headers)
+        if not sheet_names and not all_sheets:
+            report_unread_sheets(workbook, selected, headers)
+        sheets = []
+        for sheet in selected:
+            header_row, header = headers[sheet.title]
+            if all_sheets and is_dependency_header(header):
+                continue
+            if all_sheets and any(column not in header for column in REQUIRED_COLUMNS):
+                print(f"Предупреждение: Лист '{sheet.title}' пропущен: нет обязательных столбцов")
+                continue
+            check_required_columns(header, REQUIRED_COLUMNS)
+            sheets.append((sheet, header_row, [header.index(column) for column in REQUIRED_COLUMNS]))
+        if not sheets:
+            check_required_columns([], REQUIRED_COLUMNS)
+    except KeyError as e:
+        workbook.close()
+        raise ConversionError(f"Ошибка: В Excel файле нет листа {e}.")
+    except (UnicodeDecodeError, csv.Error) as e:
+        workbook.close()
+        raise ConversionError(f"Ошибка при чтении файла '{file_path}': {e}")
+    except Exception:
+        workbook.close()
+        raise
+    return workbook, sheets, dependency_sheets
+
+
+def report_unread_sheets(workbook, selected, headers):
+    """
+    Предупреждает о листах с обязательными столбцами, которые по умолчанию не читаются.
+    """
+    titles = {sheet.title for sheet in selected}
+    for sheet in workbook.worksheets:
+        header = headers[sheet.title][1]
+        if sheet.title not in titles and all(column in header for column in REQUIRED_COLUMNS):
+            print(f"Предупреждение: Лист '{sheet.title}' не прочитан: его заголовок отличается от первого листа "
+                  f"(укажите --sheet или --all-sheets)")
 
 
-def parse_arguments():
-    parser = argparse.ArgumentParser(description="Генерация SBOM файла из Excel таблицы")
-    parser.add_argument("-i", "--input", required=True, help="Путь к входному Excel-файлу (например, bom.xlsx)")
-    return parser.parse_args()
+def iter_input_rows(sheets):
+    """
+    Выдает пары (место строки, значения обязательных колонок в порядке REQUIRED_COLUMNS)
+    для строк всех выбранных листов. Место строки - (имя листа, номер строки).
+    """
+    try:
+        for sheet, header_row, indexes in sheets:
+            for row_number, values in iter_sheet_rows(sheet, header_row, indexes):
+                yield (sheet.title, row_number), values
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ConversionError(f"Ошибка при чтении таблицы: {e}")
+
+
+def read_dependency_graph(dependency_sheets, index):
+    """
+    Читает ребра из листов зависимостей и разрешает их концы через индекс компонентов.
+    Колонки refPurl и dependsOnPurl (если есть) используются для ссылок на устаревшие bom-ref.
+    """
+    graph = DependencyGraph(index)
+    try:
+        for sheet, header_row, indexes in dependency_sheets:
+            for row_number, values in iter_sheet_rows(sheet, header_row, indexes):
+                graph.add((sheet.title, row_number), *(str(value) if value is not None else None for value in values))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ConversionError(f"Ошибка при чтении таблицы зависимостей: {e}")
+    return graph
 
 
-def read_input_file(file_path):
+def read_previous_sbom(file_path):
     try:
-        return pd.read_excel(file_path)
+        return load_previous_components(file_path)
     except FileNotFoundError:
-        print(f"Ошибка: Файл '{file_path}' не найден.")
-        exit(1)
+        raise ConversionError(f"Ошибка: Файл '{file_path}' не найден.")
     except Exception as e:
-        print(f"Ошибка при чтении Excel файла: {e}")
-        exit(1)
+        raise ConversionError(f"Ошибка при чтении предыдущего SBOM файла: {e}")
 
 
-def check_required_columns(df, required_columns):
-    missing_columns = [col for col in required_columns if col not in df.columns]
+def check_required_columns(columns, required_columns):
+    missing_columns = [col for col in required_columns if col not in columns]
     if missing_columns:
-        print(f"Ошибка: В Excel файле отсутствуют обязательные столбцы: {', '.join(missing_columns)}")
-        exit(1)
+        raise ConversionError(f"Ошибка: В Excel файле отсутствуют обязательные столбцы: {', '.join(missing_columns)}")
 
 
 def convert_purl(purl, component_name=None, version=None):
-    if pd.isna(purl) and component_name and version:
-        return handle_nuget_purl(purl, component_name, version)
+    return purl_engine.convert(purl, component_name, version)
 
-    if purl.startswith("pkg:nuget/"):
-        return handle_nuget_purl(purl)
 
-    if purl.startswith("pkg:npm/"):
-        return handle_npm_purl(purl)
-
-    if purl.startswith("pkg:maven/"):
-        try:
-            _, _, maven_part = purl.partition("pkg:maven/")
-            group_and_artifact, _, version = maven_part.partition("@")
-            if group_and_artifact and version:
-                group, _, artifact = group_and_artifact.rpartition("/")
-                if group and artifact:
-                    return f"pkg:maven/{group}/{artifact}@{version}"
-        except Exception:
-            return None
-
-    generic_purl = convert_generic_purl(purl)
-    if generic_purl:
-        return generic_purl
-
-    return None
+def temporary_archive():
+    """
+    Создает временный файл для архива в системном каталоге временных файлов (TMPDIR)
+    и возвращает пару (файл, открытый на запись, путь). Файл удаляет вызывающий.
+    """
+    fd, path = tempfile.mkstemp(prefix="sbomtransfer-", suffix=".tgz")
+    return os.fdopen(fd, "wb"), path
 
 
-def compute_hash(file_path):
+def download_file(url, transport):
+    f, local_filename = temporary_archive()
     try:
-        result = subprocess.run(
-            ["/home/user/utils/CSP/cpverify", "-mk", "-alg", "GR3411", file_path],
-            capture_output=True, text=True, check=True
-        )
-        hash_value = result.stdout.strip().splitlines()[-1]
-        return hash_value.upper()
-    except subprocess.CalledProcessError as e:
-        print(f"Ошибка при расчете хэша для {file_path}: {e.stderr}")
+        with f:
+            for chunk in transport.iter_content(url):
+                f.write(chunk)
+        return local_filename
+    except Exception as e:
+        print(f"Ошибка при скачивании файла {url}: {e}")
+        os.remove(local_filename)
         return None
 
 
-def download_file(url):
-    local_filename = f"/tmp/{uuid4()}.tgz"
+def download_and_hash(url, hasher, transport):
+    """
+    Скачивает архив, передавая данные в хэш по мере поступления, без записи на диск.
+    Время хэша - процессорное время потока (time.thread_time): ожидание GIL в него не входит.
+    """
+    digest = hasher.new()
+    size = 0
+    hash_seconds = 0.0
+    started = time.perf_counter()
     try:
-        with requests.get(url, stream=True) as response:
-            response.raise_for_status()
-            with open(local_filename, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-        return local_filename
+        for chunk in transport.iter_content(url):
+            hashed = time.thread_time()
+            digest.update(chunk)
+            hash_seconds += time.thread_time() - hashed
+            size += len(chunk)
     except Exception as e:
         print(f"Ошибка при скачивании файла {url}: {e}")
+        return False, None
+    metrics.record_url(url, size, time.perf_counter() - started, hash_seconds)
+    return True, digest.hexdigest().upper()
+
+
+def download_and_inspect(url, hasher, transport):
+    """
+    Скачивает архив один раз: данные по мере поступления передаются в хэш, SHA-256 и потоковый
+    разбор tar.gz (archive_inspect). Для cpverify архив, как и без разбора, пишется во временный файл.
+    Возвращает тройку (скачан ли файл, хэш или None, ArchiveInfo или None).
+    """
+    from archive_inspect import inspect_archive
+
+    digest = hasher.new() if hasher.streaming else None
+    local_file, local_filename = (None, None) if hasher.streaming else temporary_archive()
+    started = time.perf_counter()
+    try:
+        try:
+            if digest is not None:
+                archive, hash_seconds = inspect_archive(transport.iter_content(url), [digest.update])
+            else:
+                with local_file:
+                    archive, hash_seconds = inspect_archive(transport.iter_content(url), [local_file.write])
+        except Exception as e:
+            print(f"Ошибка при скачивании файла {url}: {e}")
+            return False, None, None
+        if digest is not None:
+            hash_value = digest.hexdigest().upper()
+        else:
+            hashed = time.perf_counter()
+            hash_value = hasher.hash_file(local_filename)
+            hash_seconds += time.perf_counter() - hashed
+    finally:
+        if local_filename is not None:
+            os.remove(local_filename)
+    metrics.record_url(url, archive.size, time.perf_counter() - started, hash_seconds)
+    return True, hash_value, archive
+
+
+def create_hasher(args):
+    """
+    Встроенный хэшер на Python во много раз медленнее cpverify, поэтому по умолчанию (auto)
+    используется cpverify, если утилита установлена.
+    """
+    if args.hasher == "cpverify" or args.hasher == "auto" and cpverify_available(args.cpverify_path):
+        return CpverifyHasher(args.cpverify_path, args.cpverify_batch)
+    return StreebogHasher(args.hash_workers)
+
+
+def create_transport(args):
+    return Transport(args.per_host, args.retries, connect_timeout=args.connect_timeout, read_timeout=args.read_timeout)
+
+
+def fetch_validators(url, transport):
+    try:
+        response = transport.head(url)
+        response.raise_for_status()
+        return response_validators(response.headers)
+    except Exception:
         return None
 
 
+def fetch_distribution(url, hasher, transport, cache=None, inspect=False):
+    """
+    Скачивает архив и рассчитывает его хэш; с inspect - еще и разбирает архив за тот же проход.
+    Возвращает тройку (скачан ли файл, хэш или None, ArchiveInfo или None).
+    С inspect результат разбора хранится в кэше рядом с хэшем (ARCHIVE_INFO_ALG): архив
+    скачивается заново, только если в кэше нет его хэша или результата разбора.
+    """
+    validators = None
+    if cache is not None:
+        validators = fetch_validators(url, transport)
+        hash_value = cache.lookup(url, HASH_ALG, validators)
+        if hash_value and not inspect:
+            return True, hash_value, None
+        if hash_value:
+            from archive_inspect import ArchiveInfo
+
+            cached = cache.lookup(url, ARCHIVE_INFO_ALG, validators)
+            archive = ArchiveInfo.from_json(cached) if cached else None
+            if archive is not None:
+                return True, hash_value, archive
+
+    archive = None
+    if inspect:
+        downloaded, hash_value, archive = download_and_inspect(url, hasher, transport)
+        if not downloaded:
+            return False, None, None
+    elif hasher.streaming:
+        downloaded, hash_value = download_and_hash(url, hasher, transport)
+        if not downloaded:
+            return False, None, None
+    else:
+        started = time.perf_counter()
+        file_path = download_file(url, transport)
+        if not file_path:
+            return False, None, None
+        try:
+            hashed = time.perf_counter()
+            hash_value = hasher.hash_file(file_path)
+            finished = time.perf_counter()
+            metrics.record_url(url, os.path.getsize(file_path), finished - started, finished - hashed)
+        finally:
+            os.remove(file_path)
+
+    if cache is not None and validators and hash_value:
+        cache.store(url, HASH_ALG, validators, hash_value)
+        if archive is not None:
+            cache.store(url, ARCHIVE_INFO_ALG, validators, archive.to_json())
+    return True, hash_value, archive
+
+
 def validate_github_website_url(url):
     """
     Проверяет, соответствует ли URL формату https://github.com/{author}/{repo}
@@ -114,229 +377,192 @@ def extract_github_repo(url):
     return None, None
 
 
-def process_external_references(row, component_name, version):
-    external_references = []
-    unique_urls = set()
+def process_external_references(references_value, component_name, version, distributions=None):
+    """
+    Собирает ссылки компонента из значения колонки externalReferences. distributions - результаты
+    fetch_distribution по url архивов строки (их готовит DistributionPrefetcher с общими для
+    преобразования hasher и transport); архив без результата считается не скачанным.
+    """
+    distributions = distributions or {}
+    references = ReferenceSet()
     github_distribution_urls = []
     is_github_purl = False
 
-    if pd.notna(row["externalReferences"]):
-        for ref in str(row["externalReferences"]).split(","):
+    if not is_missing(references_value):
+        for ref in str(references_value).split(","):
             ref = ref.strip()
-            if ref.endswith(".tgz") or ref.endswith(".tar.gz"):
+            if is_distribution_url(ref):
                 if ref.startswith("https://github.com/"):
                     github_distribution_urls.append(ref)
-                file_path = download_file(ref)
-                if file_path:
-                    hash_value = compute_hash(file_path)
-                    os.remove(file_path)
-                    external_references.append({
-                        "type": "distribution",
-                        "url": ref
-                    })
+                downloaded, hash_value, archive = distributions.get(ref, (False, None, None))
+                if downloaded:
+                    references.add("distribution", ref)
                     if hash_value:
-                        external_references.append({
-                            "type": "source-distribution",
-                            "url": ref,
-                            "hashes": [
-                                {
-                                    "alg": "STREEBOG-256",
-                                    "content": hash_value
-                                }
-                            ]
-                        })
+                        hashes = [Hash(HASH_ALG, hash_value)]
+                        if archive is not None:
+                            hashes.append(Hash(SECOND_HASH_ALG, archive.sha256))
+                        references.add("source-distribution", ref, hashes)
             else:
-                if ref not in unique_urls:
+                if not references.has("website", ref):
                     # Дополнительная проверка для типа "website"
                     if ref.startswith("https://github.com/"):
                         if validate_github_website_url(ref):
-                            external_references.append({
-                                "type": "website",
-                                "url": ref
-                            })
-                            unique_urls.add(ref)
+                            references.add("website", ref)
                             is_github_purl = True
                         else:
                             print(f"Предупреждение: Некорректный формат GitHub URL для 'website': {ref}")
                             continue  # Пропустить некорректный URL
                     else:
-                        external_references.append({
-                            "type": "website",
-                            "url": ref
-                        })
-                        unique_urls.add(ref)
-                if ref.startswith("https://github.com/"):
-                    vcs_url = handle_github_purl(ref)
-                elif ref.startswith("https://www.nuget.org/packages/"):
-                    if not is_github_purl:
-                        vcs_url = nuget_url_to_purl(ref)
-                    else:
-                        vcs_url = None
+                        references.add("website", ref)
+                if is_github_purl and ref.startswith("https://www.nuget.org/packages/"):
+                    vcs_url = None
                 else:
-                    vcs_url = ref
+                    vcs_url = purl_engine.url_to_purl(ref)
                 if vcs_url:
-                    external_references.append({
-                        "type": "vcs",
-                        "url": vcs_url
-                    })
+                    references.add("vcs", vcs_url)
     else:
         nuget_external_reference = generate_nuget_external_reference(component_name, version)
-        if nuget_external_reference and nuget_external_reference not in unique_urls:
-            external_references.append({
-                "type": "website",
-                "url": nuget_external_reference
-            })
-            unique_urls.add(nuget_external_reference)
-            external_references.append({
-                "type": "vcs",
-                "url": handle_nuget_purl(None, component_name, version)
-            })
+        if nuget_external_reference:
+            references.add("website", nuget_external_reference)
+            references.add("vcs", convert_purl(None, component_name, version))
 
     # Дополнительная проверка: если есть distribution с GitHub, то website должен быть только https://github.com/*/*
-    if github_distribution_urls:
-        for dist_url in github_distribution_urls:
-            author, repo = extract_github_repo(dist_url)
-            if author and repo:
-                github_repo_url = f"https://github.com/{author}/{repo}"
-                # Удаляем все website ссылки, которые не соответствуют формату GitHub репозитория
-                external_references = [
-                    ref for ref in external_references
-                    if not (ref.get("type") == "website" and ref.get("url", "").startswith("https://github.com/"))
-                ]
-                # Добавляем корректную GitHub репозитория ссылку
-                if validate_github_website_url(github_repo_url):
-                    external_references.append({
-                        "type": "website",
-                        "url": github_repo_url
-                    })
-        # Удаляем возможные дубликаты
-        seen = set()
-        unique_external_references = []
-        for ref in external_references:
-            try:
-                ref_string = json.dumps(ref, sort_keys=True)
-            except TypeError:
-                ref_string = str(ref)
-            if ref_string not in seen:
-                seen.add(ref_string)
-                unique_external_references.append(ref)
-        external_references = unique_external_references
-
-    return external_references
-
-
-def create_sbom_components(df):
-    components = []
-    dependencies = []
-
-    for _, row in df.iterrows():
-        bom_ref = row["BOM Reference"] if pd.notna(row["BOM Reference"]) else str(uuid4())
-        component_name = row["Component"]
-        version = row["Version"]
-
-        attack_surface = row["attack_surface"] if row["attack_surface"] in ["yes", "no"] else "undefined"
-        security_function = row["security_function"] if row["security_function"] in ["yes", "no"] else "undefined"
-
-        component = {
-            "type": row["Type"] if pd.notna(row["Type"]) else "library",
-            "bom-ref": bom_ref,
-            "name": component_name,
-            "version": str(version) if pd.notna(version) else "",
-            "purl": convert_purl(row["PURL"], component_name, version),
-            "properties": [
-                {
-                    "name": "GOST:attack_surface",
-                    "value": attack_surface
-                },
-                {
-                    "name": "GOST:security_function",
-                    "value": security_function
-                }
-            ]
-        }
+    for dist_url in github_distribution_urls:
+        author, repo = extract_github_repo(dist_url)
+        if author and repo:
+            github_repo_url = f"https://github.com/{author}/{repo}"
+            # Удаляем все website ссылки, которые не соответствуют формату GitHub репозитория
+            references.remove_origin("https://github.com/", "website")
+            # Добавляем корректную GitHub репозитория ссылку
+            if validate_github_website_url(github_repo_url):
+                references.add("website", github_repo_url)
 
-        external_references = process_external_references(row, component_name, version)
+    return references
 
-        # Проверка наличия ссылок на GitHub в type "distribution" и установка pkg:github, если найдена
-        github_distribution = any(
-            ref.get("type") == "distribution" and ref.get("url", "").startswith("https://github.com/")
-            for ref in external_references
-        )
-        if github_distribution:
-            # Найдем первый GitHub distribution URL
-            github_dist_url = next(
-                (ref["url"] for ref in external_references if ref.get("type") == "distribution" and ref.get("url", "").startswith("https://github.com/")),
-                None
-            )
-            if github_dist_url:
-                author, repo = extract_github_repo(github_dist_url)
-                if author and repo:
-                    component["purl"] = f"pkg:github/{author}/{repo}@{version}"
+
+def normalize_row(values):
+    """
+    Нормализует значения одной строки таблицы (в порядке REQUIRED_COLUMNS) и возвращает
+    кортеж для сборки компонента:
+    (bom_ref, component_name, version, type, version_str, purl, attack_surface, security_function, externalReferences, fingerprint)
+    Отпечаток считается по исходным значениям ячеек, до нормализации.
+    """
+    name, version, component_type, bom_ref, purl, attack_surface, security_function, references = values
+    return (
+        bom_ref if bom_ref is not None else str(uuid4()),
+        name,
+        version,
+        component_type if component_type is not None else "library",
+        str(version) if version is not None else "",
+        convert_purl(purl, name, version),
+        attack_surface if attack_surface in ("yes", "no") else "undefined",
+        security_function if security_function in ("yes", "no") else "undefined",
+        references,
+        row_fingerprint(values)
+    )
+
+
+def build_component(bom_ref, component_name, version, component_type, version_str, purl,
+                    attack_surface, security_function, references_value, fingerprint, distributions=None):
+    references = process_external_references(references_value, component_name, version, distributions)
+
+    # Первый distribution-архив с GitHub определяет pkg:github и запрещает ссылки nuget
+    github_dist_url = references.first("distribution", "https://github.com/")
+    if github_dist_url:
+        author, repo = extract_github_repo(github_dist_url)
+        if author and repo:
+            purl = f"pkg:github/{author}/{repo}@{version}"
+
+    # Если purl у компонента pkg:github, удалить все nuget external references
+    if purl and purl.startswith("pkg:github/"):
+        references.remove_origin("https://www.nuget.org/")
+        references.remove_origin("pkg:nuget/")
+
+    if purl and purl.startswith("pkg:npm/"):
+        found_npm_website = any("npmjs.com/package" in url for url in references.urls("website"))
+        if not found_npm_website:
+            npm_website = purl_engine.npm_website(purl)
+            if npm_website:
+                references.add("website", npm_website, front=True)
+
+    if (attack_surface == "undefined" or security_function == "undefined") and not github_dist_url:
+        nuget_external_reference = generate_nuget_external_reference(component_name, version)
+        if nuget_external_reference and not references.has_url(nuget_external_reference):
+            references.add("website", nuget_external_reference)
+            references.add("vcs", convert_purl(None, component_name, version))
+
+    vcs_purl = references.first("vcs")
+    if vcs_purl:
+        purl = vcs_purl
+
+    properties = [
+        Property("GOST:attack_surface", attack_surface),
+        Property("GOST:security_function", security_function)
+    ]
+    if fingerprint:
+        properties.append(Property(FINGERPRINT_PROPERTY, fingerprint))
+    licenses = None
+    # Объявленные данные берутся из первого разобранного архива с манифестом или лицензией
+    archive = first_archive(references, distributions)
+    if archive is not None:
+        for name, field in DECLARED_PROPERTIES:
+            value = getattr(archive, field)
+            if value:
+                properties.append(Property(name, value))
+        if archive.licenses:
+            licenses = license_choice([License(kind, value) for kind, value in archive.licenses])
+    return Component(component_type, bom_ref, component_name, version_str, purl, properties,
+                     references.to_list() if references else None, licenses)
+
+
+def first_archive(references, distributions):
+    if not distributions:
+        return None
+    for url in references.urls("distribution"):
+        result = distributions.get(url)
+        archive = result[2] if result else None
+        if archive is not None and (archive.manifest or archive.licenses):
+            return archive
+    return None
+
+
+def iter_sbom_components(rows, prefetcher, previous_index=None, stats=None, purl_types=None, fingerprints=False):
+    """
+    Выдает пары (место строки, компонент) по парам (место строки, нормализованная строка)
+    по одному, в исходном порядке. Загрузка архивов строки начинается сразу после
+    ее чтения, а компонент собирается, когда они готовы.
+    Строка с тем же отпечатком из предыдущего SBOM используется без изменений, вместе
+    с хэшами и bom-ref, и ее архивы не скачиваются; компонент, у которого нет хэшей
+    архивов строки (загрузка не удалась), пересчитывается. В stats (Counter) считаются строки
+    ("rows") и взятые из предыдущего SBOM ("reused_rows"), в purl_types - типы PURL.
+    Отпечатки строк записываются в компоненты только с fingerprints.
+    """
+    def planned():
+        for location, values in rows:
+            references_value = values[8]
+            urls = collect_distribution_urls([references_value]) if references_value is not None else []
+            previous = take_previous(previous_index, values[-1], urls) if previous_index else None
+            if previous is not None:
+                urls = []
+            yield (location, values, previous), urls
+
+    for (location, values, previous), distributions in iter_in_order(planned(), prefetcher, PREFETCH_WINDOW):
+        if stats is not None:
+            stats["rows"] += 1
+        if purl_types is not None:
+            purl_types[purl_type(values[5]) if values[5] else None] += 1
+        if previous is not None:
+            if stats is not None:
+                stats["reused_rows"] += 1
+            yield location, previous
         else:
-            # Если purl был установлен ранее, оставить как есть
-            if not component["purl"]:
-                component["purl"] = convert_purl(row["PURL"], component_name, version)
-
-        # Если purl у компонента pkg:github, удалить все nuget external references
-        if component["purl"] and component["purl"].startswith("pkg:github/"):
-            external_references = [
-                ref for ref in external_references
-                if not (ref.get("url", "").startswith("https://www.nuget.org/") or ref.get("url", "").startswith("pkg:nuget/"))
-            ]
-
-        purl_value = component.get("purl", "")
-        if purl_value and purl_value.startswith("pkg:npm/"):
-            found_npm_website = any(
-                ref.get("type") == "website" and "npmjs.com/package" in ref.get("url", "")
-                for ref in external_references
-            )
-            if not found_npm_website:
-                npm_website = npm_purl_to_website(component["purl"])
-                if npm_website:
-                    external_references.insert(0, {
-                        "type": "website",
-                        "url": npm_website
-                    })
-
-        # Определяем, есть ли GitHub distribution для исключения добавления nuget external references
-        has_github_distribution = any(
-            ref.get("type") == "distribution" and ref.get("url", "").startswith("https://github.com/")
-            for ref in external_references
-        )
+            yield location, build_component(*values[:-1], values[-1] if fingerprints else None, distributions)
 
-        if (attack_surface == "undefined" or security_function == "undefined") and not has_github_distribution:
-            nuget_external_reference = generate_nuget_external_reference(component_name, version)
-            if nuget_external_reference and nuget_external_reference not in {ref['url'] for ref in external_references}:
-                external_references.append({
-                    "type": "website",
-                    "url": nuget_external_reference
-                })
-                external_references.append({
-                    "type": "vcs",
-                    "url": handle_nuget_purl(None, component_name, version)
-                })
-
-        vcs_purl = None
-        for ref in external_references:
-            if ref.get("type") == "vcs":
-                vcs_purl = ref.get("url")
-                break
-        if vcs_purl and component.get("purl") != vcs_purl:
-            component["purl"] = vcs_purl
-
-        if external_references:
-            component["externalReferences"] = external_references
-
-        components.append(component)
-        dependencies.append({
-            "ref": bom_ref,
-            "dependsOn": []
-        })
-
-    return components, dependencies
-
-
-def generate_sbom(components, dependencies):
+
+def sbom_header():
+    """
+    Поля SBOM перед массивами components и dependencies.
+    """
     return {
         "bomFormat": "CycloneDX",
         "specVersion": "1.6",
@@ -360,33 +586,280 @@ def generate_sbom(components, dependencies):
                     "name": "_Test_org"
                 }
             }
-        },
-        "components": components,
-        "dependencies": dependencies
+        }
     }
 
 
-def save_sbom_to_file(sbom_data, output_file):
+def save_sbom_to_file(components, output_file, compact=False, compress=False, header=None, dependencies=None):
+    """
+    Записывает SBOM потоково: компонент сериализуется сразу после сборки, в памяти
+    остаются только bom-ref для раздела dependencies. dependencies - функция, которая
+    по списку bom-ref компонентов выдает элементы раздела dependencies; по умолчанию
+    у каждого компонента пустой список зависимостей.
+    """
+    refs = []
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(sbom_data, f, indent=4, ensure_ascii=False)
+        with SbomWriter(output_file, header or sbom_header(), compact, compress) as writer:
+            for component in components:
+                writer.add_component(component)
+                refs.append(component_ref(component))
+            if dependencies is None:
+                entries = ({"ref": ref, "dependsOn": []} for ref in refs)
+            else:
+                entries = dependencies(refs)
+            for entry in entries:
+                writer.add_dependency(entry)
         print(f"SBOM файл успешно сохранен: {output_file}")
-    except Exception as e:
-        print(f"Ошибка при записи SBOM файла: {e}")
-        exit(1)
+    except OSError as e:
+        raise ConversionError(f"Ошибка при записи SBOM файла: {e}")
 
 
-def main():
-    args = parse_arguments()
-    df = read_input_file(args.input)
+def convert(args, hasher=None, transport=None, hash_memory=None):
+    """
+    Преобразует один Excel-файл в SBOM и возвращает путь к результату.
+    Переданные hasher и transport используются вместо создаваемых на время вызова,
+    что позволяет переиспользовать соединения и пул cpverify между файлами;
+    hash_memory (HashMemory) сохраняет найденные хэши в памяти между вызовами.
+    При ошибке выбрасывает ConversionError.
+    """
+    metrics.start(bool(args.profile or args.metrics_json))
+    started = time.perf_counter()
 
-    check_required_columns(df, ["Component", "Version", "Type", "BOM Reference", "PURL", "attack_surface", "security_function", "externalReferences"])
+    with metrics.stage("read"):
+        workbook, sheets, dependency_sheets = read_input_file(args.input, args.sheet, args.all_sheets)
+    try:
+        previous_index = None
+        # Отпечатки нужны следующему запуску с --previous
+        fingerprints = args.emit_fingerprints or bool(args.previous)
+        if args.previous:
+            with metrics.stage("previous"):
+                previous_index = read_previous_sbom(args.previous)
+
+        compress = args.gzip or bool(args.output and args.output.endswith(".gz"))
+        output_file = args.output or os.path.splitext(args.input)[0] + (".json.gz" if compress else ".json")
+
+        own_hasher = hasher is None
+        if own_hasher:
+            hasher = create_hasher(args)
+        cache = None
+        if not args.no_cache:
+            cache = HashCache(args.cache_dir, args.cache_max_age, args.cache_max_entries, args.refresh, hash_memory)
+        own_transport = transport is None
+        if own_transport:
+            transport = create_transport(args)
+        stats = Counter()
+        purl_types = Counter() if metrics.enabled else None
+        prefetcher = DistributionPrefetcher(
+            partial(fetch_distribution, hasher=hasher, transport=transport, cache=cache, inspect=args.inspect_archives), args.jobs
+        )
+        checker = None
+        if args.validate:
+            # jsonschema импортируется, только если нужна проверка по схеме
+            from sbom_schema import ComponentChecker
+            checker = ComponentChecker()
+        graph = None
+        verifier = None
+        url_cache = None
+        if args.verify_urls:
+            if not args.no_cache:
+                url_cache = UrlCheckCache(args.cache_dir, args.verify_ttl, args.refresh)
+            verifier = UrlVerifier(transport, args.jobs, args.verify_rate, url_cache)
+        try:
+            # Строки читаются, нормализуются, собираются и записываются одним проходом;
+            # архивы скачиваются и хэшируются параллельно, начиная с первой прочитанной строки,
+            # а порядок компонентов и ссылок совпадает с последовательной обработкой.
+            # Ссылки готовых компонентов проверяются в это же время, а сами компоненты
+            # сверяются со схемой до записи, вместе с номером исходной строки
+            with prefetcher, verifier or nullcontext():
+                rows = (
+                    (location, normalize_row(values))
+                    for location, values in metrics.timed("read", iter_input_rows(sheets))
+                )
+                header = sbom_header()
+                dependency_entries = None
+                if dependency_sheets:
+                    # Компоненты индексируются по мере сборки, а граф восстанавливается
+                    # после записи компонентов, когда известны все bom-ref
+                    root_ref = header["metadata"]["component"]["bom-ref"]
+                    index = RefIndex(root_ref)
+                    rows = index.track_rows(rows, lambda values: values[5])
+                    located = index.track(iter_sbom_components(rows, prefetcher, previous_index, stats, purl_types, fingerprints))
+
+                    def graph_entries(refs):
+                        nonlocal graph
+                        with metrics.stage("dependencies"):
+                            graph = read_dependency_graph(dependency_sheets, index)
+                        return graph.entries(refs, root_ref)
+
+                    dependency_entries = graph_entries
+                else:
+                    located = iter_sbom_components(rows, prefetcher, previous_index, stats, purl_types, fingerprints)
+                if checker is not None:
+                    report_header_errors(checker.check_header(header))
+                    located = checker.track(located)
+                components = (component for _, component in located)
+                if verifier is not None:
+                    components = verifier.track(components)
+                save_sbom_to_file(components, output_file, args.compact, compress, header, dependency_entries)
+                if verifier is not None:
+                    report_url_failures(verifier)
+        finally:
+            if cache is not None:
+                cache.close()
+                if prefetcher.submitted:
+                    print(f"Кэш хэшей: попаданий {cache.hits}, промахов {cache.misses}")
+                    metrics.count("cache_hits", cache.hits)
+                    metrics.count("cache_misses", cache.misses)
+            if url_cache is not None:
+                url_cache.close()
+                if verifier.submitted:
+                    print(f"Кэш проверок ссылок: попаданий {url_cache.hits}, промахов {url_cache.misses}")
+            if prefetcher.submitted or verifier is not None and verifier.submitted:
+                requests_made, reused, retried = transport.stats()
+                print(f"Сеть: запросов {requests_made}, повторно использовано соединений {reused}, повторов {retried}")
+                metrics.count("http_requests", requests_made)
+                metrics.count("http_retries", retried)
+            if own_transport:
+                transport.close()
+            if own_hasher:
+                hasher.close()
+    finally:
+        workbook.close()
+
+    if args.previous:
+        print(f"Строк из предыдущего SBOM: {stats['reused_rows']}, пересчитано: {stats['rows'] - stats['reused_rows']}")
+        metrics.count("reused_rows", stats["reused_rows"])
+
+    if graph is not None:
+        report_dependencies(graph)
+
+    if checker is not None:
+        report_schema_errors(checker, len(sheets) > 1)
+
+    if metrics.enabled:
+        metrics.count("rows", stats["rows"])
+        metrics.count("distribution_urls", prefetcher.submitted)
+        # Ожидание архивов - время этапа download_hash, остальное время прохода - сборка и запись
+        metrics.add_time("download_hash", prefetcher.wait_seconds)
+        if verifier is not None:
+            metrics.add_time("verify_urls", verifier.wait_seconds)
+        if checker is not None:
+            metrics.add_time("validate", checker.seconds)
+        elapsed = time.perf_counter() - started
+        metrics.add_time("assemble_write", elapsed - sum(metrics.stages.values()))
+        emit_metrics(args, purl_types)
+    # SBOM уже записан, но с некорректными компонентами преобразование считается неудачным
+    if checker is not None and checker.invalid:
+        raise ConversionError(f"Ошибка: Компонентов, не соответствующих схеме CycloneDX 1.6: {len(checker.invalid)}")
+    return output_file
+
+
+def report_url_failures(verifier):
+    """
+    Дожидается проверки ссылок и выводит недоступные ссылки по компонентам.
+    """
+    failures = verifier.failures()
+    metrics.count("verified_urls", verifier.submitted)
+    metrics.count("dead_urls", len({url for _, url, _, _ in failures}))
+    if not failures:
+        print(f"Проверка ссылок: проверено {verifier.submitted}, недоступных нет")
+        return
+    print(f"Проверка ссылок: проверено {verifier.submitted}, недоступных ссылок у компонентов: {len(failures)}")
+    for label, url, status, error in failures:
+        reason = f"код ответа {status}" if status is not None else error
+        print(f"  {label}: {url} ({reason})")
+
+
+def format_location(location, with_sheet=False):
+    sheet_title, row_number = location
+    if with_sheet:
+        return f"лист '{sheet_title}', строка {row_number}"
+    return f"строка {row_number}"
+
+
+def report_dependencies(graph):
+    metrics.count("dependency_edges", graph.edges)
+    metrics.count("dangling_edges", graph.dangling)
+    print(f"Зависимостей восстановлено: {graph.edges}")
+    if graph.dangling:
+        print(f"Предупреждение: Ребер зависимостей с неизвестными bom-ref пропущено: {graph.dangling}")
+        for location, key in graph.dangling_examples:
+            place = format_location(location, True) if location else "ребро без компонента в SBOM"
+            print(f"  {place}: {key if key is not None else '(пусто)'}")
+
+
+def report_header_errors(errors):
+    for path, message in errors:
+        print(f"Предупреждение: Заголовок SBOM не соответствует схеме CycloneDX 1.6: {path}: {message}")
+
+
+def report_schema_errors(checker, with_sheet=False):
+    """
+    Выводит компоненты, не соответствующие схеме, с местом исходной строки таблицы.
+    """
+    metrics.count("validated_components", checker.checked)
+    metrics.count("invalid_components", len(checker.invalid))
+    metrics.count("gost_hashes", checker.gost_hashes)
+    if checker.gost_hashes:
+        print(f"Хэшей ГОСТ Р 34.11-2012 вне перечня алгоритмов CycloneDX 1.6 (допускаются профилем ГОСТ): {checker.gost_hashes}")
+    if not checker.invalid:
+        print(f"Проверка по схеме CycloneDX 1.6: проверено компонентов {checker.checked}, ошибок нет")
+        return
+    print(f"Проверка по схеме CycloneDX 1.6: проверено компонентов {checker.checked}, с ошибками: {len(checker.invalid)}")
+    for location, label, errors in checker.invalid:
+        for path, message in errors:
+            print(f"  {format_location(location, with_sheet)} ({label}): {path or '/'}: {message}")
+
+
+def purl_type_counts(counts):
+    """
+    Число компонентов по типам PURL и имя обработчика каждого типа.
+    """
+    return {
+        type_name or "нет": {
+            "count": count,
+            "handler": purl_engine.handler(f"pkg:{type_name}/").__name__ if type_name else None
+        }
+        for type_name, count in counts.most_common()
+    }
 
-    components, dependencies = create_sbom_components(df)
-    sbom_data = generate_sbom(components, dependencies)
 
-    output_file = os.path.splitext(args.input)[0] + ".json"
-    save_sbom_to_file(sbom_data, output_file)
+def emit_metrics(args, purl_types):
+    report = metrics.report(input=args.input, purl_types=purl_type_counts(purl_types), purl_cache=purl_engine.stats())
+    if args.profile:
+        print(format_report(report))
+    if args.metrics_json:
+        try:
+            save_report(report, args.metrics_json)
+        except Exception as e:
+            raise ConversionError(f"Ошибка при записи файла метрик: {e}")
+
+
+def run_profiled(args, output_file):
+    """
+    Выполняет преобразование под cProfile. Профилируется основной поток:
+    время потоков загрузки видно в нем как ожидание пула.
+    """
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(convert, args)
+    finally:
+        profiler.dump_stats(output_file)
+        print(f"Профиль сохранен: {output_file} (python -m pstats {output_file})")
+
+
+def main():
+    args = parse_arguments()
+    try:
+        if args.cprofile:
+            run_profiled(args, args.cprofile)
+        else:
+            convert(args)
+    except ConversionError as e:
+        print(e)
+        exit(1)
 
 
 if __name__ == "__main__":
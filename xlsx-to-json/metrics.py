@@ -0,0 +1,132 @@
+# xlsx-to-json/metrics.py
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+SLOWEST_URLS = 10
+
+
+class Metrics:
+    """
+    Сбор метрик одного преобразования: время этапов, счетчики и сведения о загрузках.
+    Пока сбор не включен через start(True), методы ничего не записывают, а подсчеты
+    по строкам выполняются только при формировании отчета.
+    """
+
+    def __init__(self):
+        self.start(False)
+
+    def start(self, enabled):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.urls = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def add_time(self, name, seconds):
+        """
+        Добавляет к этапу время, измеренное вне stage() (например, ожидание загрузок).
+        """
+        if self.enabled:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def timed(self, name, items):
+        """
+        Выдает элементы items, относя время получения каждого к этапу name.
+        Нужен для потоковых этапов, которые чередуются с остальными.
+        """
+        if not self.enabled:
+            yield from items
+            return
+        items = iter(items)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - started)
+                return
+            self.add_time(name, time.perf_counter() - started)
+            yield item
+
+    def count(self, name, value=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_url(self, url, size, seconds, hash_seconds):
+        """
+        Сохраняет сведения о загрузке одного архива: размер, общее время и время расчета хэша.
+        hash_seconds - процессорное время потока загрузки на хэш; если хэш считает другой процесс
+        (cpverify, пул --hash-workers), - время ожидания результата.
+        """
+        if self.enabled:
+            with self._lock:
+                self.urls.append({
+                    "url": url,
+                    "bytes": size,
+                    "seconds": round(seconds, 4),
+                    "hash_seconds": round(hash_seconds, 4)
+                })
+
+    def report(self, **sections):
+        total = time.perf_counter() - self.started
+        downloads = {
+            "count": len(self.urls),
+            "bytes": sum(item["bytes"] for item in self.urls),
+            "seconds": round(sum(item["seconds"] for item in self.urls), 4),
+            "hash_seconds": round(sum(item["hash_seconds"] for item in self.urls), 4)
+        }
+        report = {
+            "total_seconds": round(total, 4),
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            "counters": dict(self.counters),
+            "downloads": downloads,
+            "slowest_urls": sorted(self.urls, key=lambda item: item["seconds"], reverse=True)[:SLOWEST_URLS]
+        }
+        report.update(sections)
+        return report
+
+
+def format_report(report):
+    """
+    Краткая таблица для вывода в консоль.
+    """
+    total = report["total_seconds"] or 1
+    lines = [f"{'Этап':<16}{'Время, с':>12}{'Доля':>8}"]
+    for name, seconds in report["stages"].items():
+        lines.append(f"{name:<16}{seconds:>12.3f}{seconds / total:>8.0%}")
+    lines.append(f"{'всего':<16}{report['total_seconds']:>12.3f}")
+    for name, value in report["counters"].items():
+        lines.append(f"{name}: {value}")
+    downloads = report["downloads"]
+    if downloads["count"]:
+        lines.append(
+            f"Загрузки: {downloads['count']}, {downloads['bytes']} байт, {downloads['seconds']:.3f} с,"
+            f" из них расчет хэша {downloads['hash_seconds']:.3f} с"
+        )
+        lines.append("Самые медленные URL:")
+        for item in report["slowest_urls"][:5]:
+            lines.append(f"  {item['seconds']:.3f} с  {item['bytes']:>10} байт  {item['url']}")
+    for type_name, item in report.get("purl_types", {}).items():
+        lines.append(f"PURL {type_name}: {item['count']} ({item['handler']})")
+    return "\n".join(lines)
+
+
+def save_report(report, output_file):
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
@@ -0,0 +1,109 @@
+# xlsx-to-json/model.py
+
+"""
+Компактная модель компонентов SBOM. Объекты со __slots__ занимают в несколько раз
+меньше памяти, чем вложенные словари, и сериализуются sbom_writer без промежуточных dict.
+"""
+
+
+class Hash:
+    __slots__ = ("alg", "content")
+
+    def __init__(self, alg, content):
+        self.alg = alg
+        self.content = content
+
+    def to_dict(self):
+        return {"alg": self.alg, "content": self.content}
+
+
+class ExternalReference:
+    __slots__ = ("type", "url", "hashes")
+
+    def __init__(self, ref_type, url, hashes=None):
+        self.type = ref_type
+        self.url = url
+        self.hashes = hashes
+
+    def to_dict(self):
+        ref = {"type": self.type, "url": self.url}
+        if self.hashes:
+            ref["hashes"] = [item.to_dict() for item in self.hashes]
+        return ref
+
+
+class Property:
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def to_dict(self):
+        return {"name": self.name, "value": self.value}
+
+
+class License:
+    """
+    Лицензия компонента: kind - "id" (SPDX), "name" или "expression" (выражение SPDX).
+    """
+
+    __slots__ = ("kind", "value", "acknowledgement")
+
+    def __init__(self, kind, value, acknowledgement="declared"):
+        self.kind = kind
+        self.value = value
+        self.acknowledgement = acknowledgement
+
+    def to_dict(self):
+        if self.kind == "expression":
+            return {"expression": self.value, "acknowledgement": self.acknowledgement}
+        return {"license": {self.kind: self.value, "acknowledgement": self.acknowledgement}}
+
+
+def license_choice(licenses):
+    """
+    Список лицензий для поля licenses: выражение SPDX допускается только одно и без других лицензий.
+    """
+    for item in licenses:
+        if item.kind == "expression":
+            return [item]
+    return list(licenses)
+
+
+class Component:
+    __slots__ = ("type", "bom_ref", "name", "version", "purl", "properties", "external_references", "licenses")
+
+    def __init__(self, component_type, bom_ref, name, version, purl, properties, external_references=None, licenses=None):
+        self.type = component_type
+        self.bom_ref = bom_ref
+        self.name = name
+        self.version = version
+        self.purl = purl
+        self.properties = properties
+        self.external_references = external_references
+        self.licenses = licenses
+
+    def to_dict(self):
+        component = {
+            "type": self.type,
+            "bom-ref": self.bom_ref,
+            "name": self.name,
+            "version": self.version,
+            "purl": self.purl,
+        }
+        if self.licenses:
+            component["licenses"] = [item.to_dict() for item in self.licenses]
+        component["properties"] = [prop.to_dict() for prop in self.properties]
+        if self.external_references:
+            component["externalReferences"] = [ref.to_dict() for ref in self.external_references]
+        return component
+
+
+def component_ref(component):
+    """
+    bom-ref компонента модели или компонента, взятого из предыдущего SBOM в виде словаря.
+    """
+    if isinstance(component, dict):
+        return component.get("bom-ref")
+    return component.bom_ref
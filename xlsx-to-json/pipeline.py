@@ -0,0 +1,86 @@
+# xlsx-to-json/pipeline.py
+
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def is_distribution_url(ref):
+    return ref.endswith(".tgz") or ref.endswith(".tar.gz")
+
+
+def collect_distribution_urls(values):
+    """
+    Собирает ссылки на архивы дистрибутивов из значений колонки externalReferences.
+    Порядок первого появления сохраняется, повторы отбрасываются.
+    """
+    urls = {}
+    for value in values:
+        for ref in str(value).split(","):
+            ref = ref.strip()
+            if is_distribution_url(ref):
+                urls.setdefault(ref, None)
+    return list(urls)
+
+
+class DistributionPrefetcher:
+    """
+    Запускает скачивание и хэширование архива пулом из `jobs` потоков, как только ссылка
+    встретилась в строке таблицы, не дожидаясь чтения остальных строк.
+    Каждый URL обрабатывается один раз за преобразование.
+    """
+
+    def __init__(self, fetch, jobs):
+        self._fetch = fetch
+        self._executor = ThreadPoolExecutor(max_workers=max(1, jobs))
+        self._futures = {}
+        self.wait_seconds = 0.0
+
+    @property
+    def submitted(self):
+        return len(self._futures)
+
+    def submit(self, urls):
+        for url in urls:
+            if url not in self._futures:
+                self._futures[url] = self._executor.submit(self._fetch, url)
+
+    def ready(self, urls):
+        return all(self._futures[url].done() for url in urls)
+
+    def results(self, urls):
+        """
+        Возвращает словарь url -> результат fetch(url), при необходимости дожидаясь загрузки.
+        """
+        started = time.perf_counter()
+        results = {url: self._futures[url].result() for url in urls}
+        self.wait_seconds += time.perf_counter() - started
+        return results
+
+    def close(self, cancel=False):
+        self._executor.shutdown(wait=True, cancel_futures=cancel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close(cancel=exc_type is not None)
+
+
+def iter_in_order(items, prefetcher, window):
+    """
+    Принимает пары (данные строки, ссылки на архивы строки) и выдает пары
+    (данные строки, результаты загрузки ее архивов) в исходном порядке.
+    Загрузки идут параллельно с чтением; строка ждет своих архивов, только когда
+    в очереди накопилось больше `window` строк или входные строки закончились.
+    """
+    pending = deque()
+    for payload, urls in items:
+        prefetcher.submit(urls)
+        pending.append((payload, urls))
+        while pending and (len(pending) > window or prefetcher.ready(pending[0][1])):
+            payload, urls = pending.popleft()
+            yield payload, prefetcher.results(urls)
+    while pending:
+        payload, urls = pending.popleft()
+        yield payload, prefetcher.results(urls)
@@ -0,0 +1,88 @@
+# xlsx-to-json/purl_engine.py
+
+import importlib
+import pkgutil
+from functools import lru_cache
+
+from handlers.generic_handler import convert_generic_purl
+from handlers.npm_handler import npm_purl_to_website
+from handlers.nuget_handler import handle_nuget_purl
+
+
+def discover_handlers(package="handlers"):
+    """
+    Собирает обработчики из модулей пакета handlers.
+    Модуль объявляет PURL_TYPES = {"<тип purl>": функция(purl)} и/или
+    URL_PREFIXES = {"<префикс URL>": функция(url)}, после чего новый тип
+    подключается без изменения main.py.
+    """
+    purl_types = {}
+    url_prefixes = {}
+    for info in pkgutil.iter_modules(importlib.import_module(package).__path__):
+        module = importlib.import_module(f"{package}.{info.name}")
+        purl_types.update(getattr(module, "PURL_TYPES", {}))
+        url_prefixes.update(getattr(module, "URL_PREFIXES", {}))
+    return purl_types, url_prefixes
+
+
+def purl_type(purl):
+    if purl.startswith("pkg:"):
+        type_name, separator, _ = purl[4:].partition("/")
+        if separator:
+            return type_name
+    return None
+
+
+class PurlEngine:
+    """
+    Нормализация PURL и связанных ссылок через таблицу обработчиков по типу purl.
+    Результаты кэшируются в ограниченных LRU-кэшах: в больших таблицах одни и те же
+    PURL и URL повторяются во многих строках.
+    """
+
+    def __init__(self, maxsize=65536):
+        self.purl_types, self.url_prefixes = discover_handlers()
+        self.normalize = lru_cache(maxsize=maxsize)(self._normalize)
+        # typed=True: версии 1 и 1.0 из таблицы дают разные PURL
+        self.nuget_purl = lru_cache(maxsize=maxsize, typed=True)(self._nuget_purl)
+        self.url_to_purl = lru_cache(maxsize=maxsize)(self._url_to_purl)
+        self.npm_website = lru_cache(maxsize=maxsize)(npm_purl_to_website)
+
+    def register(self, type_name, handler):
+        self.purl_types[type_name] = handler
+        self.normalize.cache_clear()
+
+    def convert(self, purl, component_name=None, version=None):
+        """
+        Возвращает нормализованный PURL. Пустой PURL при известных имени и версии
+        считается пакетом nuget.
+        """
+        if purl is None or purl != purl:
+            if component_name and version:
+                return self.nuget_purl(component_name, version)
+            return None
+        return self.normalize(str(purl))
+
+    def handler(self, purl):
+        return self.purl_types.get(purl_type(purl), convert_generic_purl)
+
+    def _normalize(self, purl):
+        return self.handler(purl)(purl)
+
+    def _nuget_purl(self, component_name, version):
+        return handle_nuget_purl(None, component_name, version)
+
+    def _url_to_purl(self, url):
+        """
+        Преобразует ссылку на страницу пакета в PURL; прочие ссылки возвращаются без изменений.
+        """
+        for prefix, handler in self.url_prefixes.items():
+            if url.startswith(prefix):
+                return handler(url)
+        return url
+
+    def stats(self):
+        return {
+            name: getattr(self, name).cache_info()._asdict()
+            for name in ("normalize", "nuget_purl", "url_to_purl", "npm_website")
+        }
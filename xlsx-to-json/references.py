@@ -0,0 +1,95 @@
+# xlsx-to-json/references.py
+
+from model import ExternalReference
+
+
+def url_origin(url):
+    """
+    Начало ссылки до первого "/" после хоста включительно:
+    "https://github.com/a/b" -> "https://github.com/", "pkg:nuget/X@1" -> "pkg:nuget/".
+    Для ссылок без пути возвращает None.
+    """
+    if not isinstance(url, str):
+        return None
+    scheme_end = url.find("://")
+    if scheme_end != -1:
+        start = scheme_end + 3
+    elif url.startswith("pkg:"):
+        start = 4
+    else:
+        return None
+    slash = url.find("/", start)
+    return url[:slash + 1] if slash != -1 else None
+
+
+class ReferenceSet:
+    """
+    Упорядоченный набор externalReferences компонента.
+    Ссылка определяется парой (тип, url): повторное добавление игнорируется, и в списке
+    остается первое вхождение. Поиск по паре, по url и по началу ссылки (url_origin)
+    выполняется по индексам, удаление не перестраивает список. to_list() возвращает
+    model.ExternalReference в порядке добавления; ссылки, добавленные с front=True, идут первыми.
+    """
+
+    def __init__(self):
+        self._refs = {}
+        self._by_url = {}
+        self._by_origin = {}
+        self._next = 0
+        self._first = 0
+
+    def __len__(self):
+        return len(self._refs)
+
+    def add(self, ref_type, url, hashes=None, front=False):
+        key = (ref_type, url)
+        if key in self._refs:
+            return False
+        if front:
+            self._first -= 1
+            order = self._first
+        else:
+            order = self._next
+            self._next += 1
+        self._refs[key] = (order, hashes)
+        self._by_url.setdefault(url, {})[key] = None
+        self._by_origin.setdefault(url_origin(url), {})[key] = None
+        return True
+
+    def remove(self, ref_type, url):
+        key = (ref_type, url)
+        if self._refs.pop(key, None) is None:
+            return False
+        del self._by_url[url][key]
+        del self._by_origin[url_origin(url)][key]
+        return True
+
+    def remove_origin(self, origin, ref_type=None):
+        """
+        Удаляет ссылки, начинающиеся с origin (например, "https://github.com/"), при необходимости - только одного типа.
+        """
+        for key in list(self._by_origin.get(origin, ())):
+            if ref_type is None or key[0] == ref_type:
+                self.remove(*key)
+
+    def has(self, ref_type, url):
+        return (ref_type, url) in self._refs
+
+    def has_url(self, url):
+        return bool(self._by_url.get(url))
+
+    def _ordered(self, keys):
+        return sorted(keys, key=lambda key: self._refs[key][0])
+
+    def urls(self, ref_type):
+        return [url for key_type, url in self._ordered(self._refs) if key_type == ref_type]
+
+    def first(self, ref_type, origin=None):
+        """
+        Первый по порядку url заданного типа, при необходимости - только среди ссылок с началом origin.
+        """
+        keys = self._refs if origin is None else self._by_origin.get(origin, ())
+        return next((url for key_type, url in self._ordered(keys) if key_type == ref_type), None)
+
+    def to_list(self):
+        return [ExternalReference(ref_type, url, self._refs[(ref_type, url)][1]) for ref_type, url in self._ordered(self._refs)]
@@ -0,0 +1,147 @@
+# xlsx-to-json/sbom_schema.py
+
+"""
+Проверка компонентов по схеме CycloneDX 1.6 (--validate). Схема хранится в каталоге schema/
+без изменений и читается без обращения к сети; валидатор jsonschema (draft-07) создается
+один раз на процесс, а компоненты проверяются по одному, по мере сборки.
+Хэши ГОСТ Р 34.11-2012 (STREEBOG-256/512) в перечень алгоритмов CycloneDX 1.6 не входят:
+такие ошибки схемы отделяются от остальных и считаются отдельно (GOST_HASH_ALGORITHMS).
+Ключевое слово format, как и в jsonschema без FormatChecker, не проверяется.
+"""
+
+import json
+import os
+import time
+from functools import lru_cache
+from urllib.parse import urljoin
+
+from jsonschema import Draft7Validator
+from referencing import Registry, Resource
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema")
+BOM_SCHEMA = "bom-1.6.SNAPSHOT.schema.json"
+# Схемы, на которые ссылается схема BOM по относительному имени файла
+REFERENCED_SCHEMAS = ("spdx.SNAPSHOT.schema.json", "jsf-0.82.SNAPSHOT.schema.json")
+COMPONENT_POINTER = "#/definitions/component"
+# Хэши ГОСТ Р 34.11-2012: в перечне алгоритмов CycloneDX их нет, но их требует профиль SBOM,
+# для которого формируются файлы. Схема не меняется: несоответствие перечню для этих
+# алгоритмов не считается ошибкой, но выводится отдельно
+GOST_HASH_ALGORITHMS = ("STREEBOG-256", "STREEBOG-512")
+
+
+def _load(file_name):
+    with open(os.path.join(SCHEMA_DIR, file_name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def load_schema():
+    """
+    Возвращает (схема BOM, реестр схем для разрешения $ref).
+    """
+    schema = _load(BOM_SCHEMA)
+    resources = [(schema["$id"], Resource.from_contents(schema))]
+    for file_name in REFERENCED_SCHEMAS:
+        resources.append((urljoin(schema["$id"], file_name), Resource.from_contents(_load(file_name))))
+    return schema, Registry().with_resources(resources)
+
+
+def is_gost_hash(error):
+    """
+    Ошибка схемы - только алгоритм хэша ГОСТ вне перечня hash-alg.
+    """
+    return (
+        error.validator == "enum"
+        and error.instance in GOST_HASH_ALGORITHMS
+        and list(error.absolute_path)[-1:] == ["alg"]
+    )
+
+
+class SchemaValidator:
+    """
+    Проверка компонентов SBOM по схеме CycloneDX 1.6.
+    """
+
+    def __init__(self):
+        schema, registry = load_schema()
+        self._document = Draft7Validator(schema, registry=registry)
+        self._component = self._document.evolve(schema={"$ref": schema["$id"] + COMPONENT_POINTER})
+
+    def component_errors(self, component):
+        """
+        Проверяет компонент (словарь) и возвращает пару (ошибки в виде списка (путь, сообщение),
+        пути алгоритмов хэшей ГОСТ); пустой список ошибок - компонент корректен.
+        """
+        return _errors(self._component, component)
+
+    def document_errors(self, document):
+        """
+        Ошибки документа целиком (например, заголовка SBOM с пустым списком компонентов).
+        """
+        return _errors(self._document, document)[0]
+
+
+def _message(error):
+    # Перечень допустимых значений (у типов ссылок - больше сорока) в сообщении не нужен
+    if error.validator == "enum":
+        return f"{error.instance!r} - недопустимое значение"
+    return error.message
+
+
+def _path(error):
+    return "/".join(map(str, error.absolute_path))
+
+
+def _errors(validator, instance):
+    errors = []
+    gost_hashes = []
+    for error in sorted(validator.iter_errors(instance), key=lambda error: list(map(str, error.absolute_path))):
+        if is_gost_hash(error):
+            gost_hashes.append(_path(error))
+        else:
+            errors.append((_path(error), _message(error)))
+    return errors, gost_hashes
+
+
+@lru_cache(maxsize=None)
+def schema_validator():
+    """
+    Общий для процесса валидатор: схема читается и валидатор создается один раз,
+    в том числе в пакетном режиме, где процесс преобразует много файлов.
+    """
+    return SchemaValidator()
+
+
+class ComponentChecker:
+    """
+    Проверяет компоненты по мере сборки и запоминает ошибки вместе с местом строки в таблице.
+    В gost_hashes считаются хэши ГОСТ, которые схема CycloneDX 1.6 не допускает.
+    """
+
+    def __init__(self, validator=None):
+        self._validator = validator or schema_validator()
+        self.checked = 0
+        self.invalid = []
+        self.gost_hashes = 0
+        self.seconds = 0.0
+
+    def check_header(self, header):
+        """
+        Проверяет заголовок SBOM как документ без компонентов.
+        """
+        return self._validator.document_errors(dict(header, components=[], dependencies=[]))
+
+    def track(self, located_components):
+        """
+        Пропускает пары (место строки, компонент) дальше без изменений, проверяя компоненты.
+        """
+        for location, component in located_components:
+            started = time.perf_counter()
+            data = component if isinstance(component, dict) else component.to_dict()
+            errors, gost_hashes = self._validator.component_errors(data)
+            if errors:
+                self.invalid.append((location, f"{data.get('name')}@{data.get('version')}", errors))
+            self.gost_hashes += len(gost_hashes)
+            self.checked += 1
+            self.seconds += time.perf_counter() - started
+            yield location, component
@@ -0,0 +1,178 @@
+# xlsx-to-json/sbom_writer.py
+
+import gzip
+import json
+from json.encoder import encode_basestring
+
+from model import Component
+
+_PAD = [" " * (4 * level) for level in range(8)]
+_COMPACT = (",", ":")
+
+
+def _value(value):
+    if isinstance(value, str):
+        return encode_basestring(value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _pad(level, compact):
+    return None if compact else _PAD[level]
+
+
+def _list(items, pad):
+    """
+    Массив из уже сериализованных элементов; pad - отступ закрывающей скобки, None - без пробелов.
+    """
+    if pad is None:
+        return "[" + ",".join(items) + "]"
+    if not items:
+        return "[]"
+    return "[\n" + ",\n".join(items) + "\n" + pad + "]"
+
+
+def _object(fields, pad):
+    if pad is None:
+        return "{" + ",".join(f"{encode_basestring(key)}:{value}" for key, value in fields) + "}"
+    inner = pad + "    "
+    return pad + "{\n" + ",\n".join(f"{inner}{encode_basestring(key)}: {value}" for key, value in fields) + "\n" + pad + "}"
+
+
+def _reference(ref, compact):
+    fields = [("type", _value(ref.type)), ("url", _value(ref.url))]
+    if ref.hashes:
+        fields.append(("hashes", _list(
+            [_object([("alg", _value(item.alg)), ("content", _value(item.content))], _pad(6, compact)) for item in ref.hashes],
+            _pad(5, compact)
+        )))
+    return _object(fields, _pad(4, compact))
+
+
+def _nested(value, level, compact):
+    """
+    Значение поля объекта на уровне level в виде json.dump(..., indent=4) (редкие поля без отдельной сериализации).
+    """
+    if compact:
+        return json.dumps(value, ensure_ascii=False, separators=_COMPACT)
+    return json.dumps(value, indent=4, ensure_ascii=False).replace("\n", "\n" + _PAD[level])
+
+
+def _component(component, compact):
+    """
+    Компонент в том же виде, что и json.dump(..., indent=4) для элемента массива components
+    (или json.dumps с separators=(",", ":") при compact).
+    """
+    fields = [
+        ("type", _value(component.type)),
+        ("bom-ref", _value(component.bom_ref)),
+        ("name", _value(component.name)),
+        ("version", _value(component.version)),
+        ("purl", _value(component.purl)),
+    ]
+    if component.licenses:
+        fields.append(("licenses", _nested([item.to_dict() for item in component.licenses], 3, compact)))
+    fields += [
+        ("properties", _list(
+            [_object([("name", _value(prop.name)), ("value", _value(prop.value))], _pad(4, compact)) for prop in component.properties],
+            _pad(3, compact)
+        ))
+    ]
+    if component.external_references:
+        fields.append(("externalReferences", _list(
+            [_reference(ref, compact) for ref in component.external_references], _pad(3, compact)
+        )))
+    return _object(fields, _pad(2, compact))
+
+
+def _dependency(dependency, compact):
+    if dependency.keys() != {"ref", "dependsOn"}:
+        return _dict(dependency, compact)
+    depends_on = [(_value(ref) if compact else _PAD[4] + _value(ref)) for ref in dependency["dependsOn"]]
+    return _object([("ref", _value(dependency["ref"])), ("dependsOn", _list(depends_on, _pad(3, compact)))], _pad(2, compact))
+
+
+def _dict(item, compact):
+    if compact:
+        return json.dumps(item, ensure_ascii=False, separators=_COMPACT)
+    return _PAD[2] + json.dumps(item, indent=4, ensure_ascii=False).replace("\n", "\n" + _PAD[2])
+
+
+class SbomWriter:
+    """
+    Потоковая запись SBOM: заголовок, затем компоненты и зависимости по одному элементу,
+    без построения документа в памяти. Без compact результат побайтно совпадает с
+    json.dump(sbom, f, indent=4, ensure_ascii=False); compact пишет JSON без пробелов.
+    Компоненты передаются объектами model.Component или словарями (из предыдущего SBOM).
+    """
+
+    def __init__(self, output_file, header, compact=False, compress=False):
+        self.compact = compact
+        if compress:
+            self._file = gzip.open(output_file, "wt", encoding="utf-8")
+        else:
+            self._file = open(output_file, "w", encoding="utf-8")
+        self._section = None
+        self._count = 0
+        if compact:
+            text = json.dumps(header, ensure_ascii=False, separators=_COMPACT)
+        else:
+            text = json.dumps(header, indent=4, ensure_ascii=False)
+        # Заголовок без закрывающей скобки: массивы дописываются следом
+        self._file.write(text[:text.rindex("}")].rstrip())
+
+    def _open_section(self, name):
+        self._close_section()
+        self._section = name
+        self._count = 0
+        if self.compact:
+            self._file.write(f',"{name}":[')
+        else:
+            self._file.write(f',\n{_PAD[1]}"{name}": [')
+
+    def _close_section(self):
+        if self._section is None:
+            return
+        if self.compact or not self._count:
+            self._file.write("]")
+        else:
+            self._file.write(f"\n{_PAD[1]}]")
+
+    def _write_item(self, text):
+        if self.compact:
+            self._file.write("," + text if self._count else text)
+        else:
+            self._file.write(",\n" + text if self._count else "\n" + text)
+        self._count += 1
+
+    def add_component(self, component):
+        if self._section != "components":
+            self._open_section("components")
+        if isinstance(component, Component):
+            self._write_item(_component(component, self.compact))
+        else:
+            self._write_item(_dict(component, self.compact))
+
+    def add_dependency(self, dependency):
+        if self._section != "dependencies":
+            if self._section is None:
+                self._open_section("components")
+            self._open_section("dependencies")
+        self._write_item(_dependency(dependency, self.compact))
+
+    def close(self):
+        if self._section is None:
+            self._open_section("components")
+        if self._section == "components":
+            self._open_section("dependencies")
+        self._close_section()
+        self._file.write("\n}" if not self.compact else "}")
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
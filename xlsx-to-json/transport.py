@@ -0,0 +1,126 @@
+# xlsx-to-json/transport.py
+
+import threading
+import time
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class Transport:
+    """
+    Общий HTTP-клиент для всех загрузок: один пул соединений с keep-alive,
+    ограничение числа одновременных соединений на хост, повторы с экспоненциальной
+    задержкой при ответах 5xx и обрывах соединения, таймауты на подключение и чтение.
+    Сессия создается при первом запросе: requests импортируется, только если
+    преобразованию нужна сеть.
+    """
+
+    def __init__(self, per_host=4, retries=3, backoff=0.5, connect_timeout=10, read_timeout=60):
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = (connect_timeout, read_timeout)
+        self.requests = 0
+        self.retried = 0
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._adapter = None
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    from urllib3.util.retry import Retry
+
+                    retry = Retry(
+                        total=self.retries, connect=self.retries, read=self.retries, status=self.retries,
+                        backoff_factor=self.backoff, status_forcelist=RETRY_STATUSES,
+                        allowed_methods=frozenset(["GET", "HEAD"]), raise_on_status=False
+                    )
+                    # pool_block=True: поток ждет свободного соединения, если к хосту уже открыто per_host соединений
+                    self._adapter = HTTPAdapter(pool_connections=32, pool_maxsize=self.per_host, max_retries=retry, pool_block=True)
+                    session = requests.Session()
+                    session.mount("http://", self._adapter)
+                    session.mount("https://", self._adapter)
+                    self._session = session
+        return self._session
+
+    def _count(self, response, retried=0):
+        history = response.raw.retries.history if response.raw is not None and response.raw.retries else ()
+        with self._lock:
+            self.requests += 1
+            self.retried += len(history) + retried
+
+    def head(self, url):
+        response = self.session.head(url, allow_redirects=True, timeout=self.timeout)
+        self._count(response)
+        return response
+
+    def status(self, url, method="HEAD"):
+        """
+        Возвращает код ответа на HEAD или GET с учетом перенаправлений; тело ответа не читается.
+        """
+        with self.session.request(method, url, allow_redirects=True, stream=True, timeout=self.timeout) as response:
+            self._count(response)
+            return response.status_code
+
+    def iter_content(self, url, chunk_size=65536):
+        """
+        Отдает содержимое ответа по частям. При обрыве соединения посреди передачи
+        загрузка продолжается с места остановки (Range), а если сервер не поддерживает
+        докачку - уже полученные байты пропускаются в новом ответе.
+        """
+        import requests
+
+        received = 0
+        attempt = 0
+        while True:
+            headers = {"Range": f"bytes={received}-"} if received else None
+            started = False
+            try:
+                with self.session.get(url, stream=True, headers=headers, timeout=self.timeout) as response:
+                    self._count(response, 1 if attempt else 0)
+                    response.raise_for_status()
+                    skip = received if received and response.status_code != 206 else 0
+                    started = True
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if skip:
+                            if len(chunk) <= skip:
+                                skip -= len(chunk)
+                                continue
+                            chunk, skip = chunk[skip:], 0
+                        received += len(chunk)
+                        yield chunk
+                    # urllib3 не проверяет длину тела: закрытое раньше времени соединение выглядит как конец файла
+                    expected = response.headers.get("Content-Length")
+                    if expected and expected.isdigit() and response.raw.tell() < int(expected):
+                        raise requests.exceptions.ChunkedEncodingError(
+                            f"соединение закрыто после {response.raw.tell()} из {expected} байт"
+                        )
+                return
+            except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError):
+                # Повторы до начала передачи уже выполнены на уровне пула
+                if not started or attempt >= self.retries:
+                    raise
+                attempt += 1
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+
+    def stats(self):
+        """
+        Возвращает (число запросов, число повторно использованных соединений, число повторов).
+        """
+        reused = 0
+        if self._adapter is None:
+            return self.requests, reused, self.retried
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            reused += max(0, pool.num_requests - pool.num_connections)
+        return self.requests, reused, self.retried
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
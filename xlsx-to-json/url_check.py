@@ -0,0 +1,241 @@
+# xlsx-to-json/url_check.py
+
+"""
+Проверка доступности ссылок website/vcs компонентов (--verify-urls).
+Ссылки проверяются пулом потоков параллельно со сборкой SBOM, с ограничением
+частоты запросов к одному хосту; результаты хранятся в SQLite с ограниченным сроком.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+CHECKED_TYPES = ("website", "vcs")
+# Ошибки подключения к хосту, а не к одной ссылке
+HOST_ERRORS = ("ConnectionError", "ConnectTimeout", "SSLError")
+# Сколько таких ошибок подряд (после повторов транспорта) делают хост недоступным для остальных ссылок
+HOST_FAILURES = 3
+# Проверочных запросов в секунду к одному хосту по умолчанию (--verify-rate)
+DEFAULT_RATE = 50.0
+
+
+class UrlCheckCache:
+    """
+    Постоянный кэш результатов проверки ссылок (кодов ответа сервера): запись действительна
+    ttl_hours часов с момента проверки, затем ссылка проверяется заново.
+    """
+
+    def __init__(self, directory, ttl_hours=24, refresh=False):
+        self.directory = directory
+        self.path = os.path.join(directory, "urls.sqlite3")
+        self.ttl = ttl_hours * 3600
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        """
+        Открывает базу при первом обращении. Вызывается под self._lock.
+        """
+        if self._conn is not None:
+            return self._conn
+        os.makedirs(self.directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS url_checks ("
+            " url TEXT PRIMARY KEY,"
+            " ok INTEGER NOT NULL,"
+            " status INTEGER,"
+            " error TEXT,"
+            " checked REAL NOT NULL)"
+        )
+        self._conn.commit()
+        return self._conn
+
+    def lookup(self, url):
+        """
+        Возвращает сохраненный результат (ok, status, error) или None.
+        """
+        with self._lock:
+            if not self.refresh:
+                row = self._connection().execute(
+                    "SELECT ok, status, error FROM url_checks WHERE url = ? AND checked >= ?",
+                    (url, time.time() - self.ttl)
+                ).fetchone()
+                if row:
+                    self.hits += 1
+                    return bool(row[0]), row[1], row[2]
+            self.misses += 1
+            return None
+
+    def store(self, url, result):
+        ok, status, error = result
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO url_checks VALUES (?, ?, ?, ?, ?)",
+                (url, int(ok), status, error, time.time())
+            )
+            self._conn.commit()
+
+    def close(self):
+        """
+        Удаляет просроченные записи и закрывает базу.
+        """
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.execute("DELETE FROM url_checks WHERE checked < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+
+class HostRateLimiter:
+    """
+    Не более rate запросов в секунду к одному хосту: поток, которому выпало следующее
+    окно, ждет его без блокировки запросов к другим хостам.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, now))
+            self._next[host] = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def check_url(url, transport, limiter=None):
+    """
+    Возвращает (доступна ли ссылка, код ответа, текст ошибки). Сначала отправляется HEAD;
+    при ответе 4xx/5xx ссылка перепроверяется GET, так как часть сайтов не обрабатывает HEAD.
+    """
+    try:
+        if limiter:
+            limiter.wait(url)
+        status = transport.status(url, "HEAD")
+        if status >= 400:
+            if limiter:
+                limiter.wait(url)
+            status = transport.status(url, "GET")
+    except Exception as e:
+        return False, None, type(e).__name__
+    return status < 400, status, None
+
+
+def is_checkable(url):
+    return isinstance(url, str) and (url.startswith("http://") or url.startswith("https://"))
+
+
+def component_urls(component):
+    """
+    Ссылки website и vcs компонента модели или компонента из предыдущего SBOM (словаря).
+    Ссылки vcs в виде PURL не проверяются: это не сетевые адреса.
+    """
+    if isinstance(component, dict):
+        references = [(ref.get("type"), ref.get("url")) for ref in component.get("externalReferences", ())]
+        label = f"{component.get('name')}@{component.get('version')}"
+    else:
+        references = [(ref.type, ref.url) for ref in component.external_references or ()]
+        label = f"{component.name}@{component.version}"
+    urls = dict.fromkeys(url for ref_type, url in references if ref_type in CHECKED_TYPES and is_checkable(url))
+    return label, list(urls)
+
+
+class UrlVerifier:
+    """
+    Проверяет ссылки компонентов по мере их сборки. Каждый URL проверяется один раз
+    за преобразование; результат берется из кэша, если он не устарел. Если к хосту HOST_FAILURES раз
+    подряд не удалось подключиться (после повторов транспорта), остальные его ссылки считаются
+    недоступными без запросов; успешный ответ хоста сбрасывает счетчик.
+    """
+
+    def __init__(self, transport, jobs=8, rate=DEFAULT_RATE, cache=None):
+        self._transport = transport
+        self._limiter = HostRateLimiter(rate)
+        self._cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max(1, jobs))
+        self._futures = {}
+        self._lock = threading.Lock()
+        # Хост -> (число ошибок подключения подряд, последняя ошибка)
+        self._host_failures = {}
+        self._components = []
+        self.wait_seconds = 0.0
+
+    @property
+    def submitted(self):
+        return len(self._futures)
+
+    def _check(self, url):
+        if self._cache is not None:
+            result = self._cache.lookup(url)
+            if result is not None:
+                return result
+        host = urlparse(url).netloc
+        with self._lock:
+            failures, error = self._host_failures.get(host, (0, None))
+        if failures >= HOST_FAILURES:
+            return False, None, error
+        result = check_url(url, self._transport, self._limiter)
+        with self._lock:
+            if result[2] in HOST_ERRORS:
+                failures, _ = self._host_failures.get(host, (0, None))
+                self._host_failures[host] = (failures + 1, result[2])
+            elif result[1] is not None:
+                self._host_failures.pop(host, None)
+        # Сетевые ошибки могут быть временными, поэтому в кэш попадают только ответы сервера
+        if self._cache is not None and result[1] is not None:
+            self._cache.store(url, result)
+        return result
+
+    def track(self, components):
+        """
+        Пропускает компоненты дальше без изменений, отправляя их ссылки на проверку.
+        """
+        for component in components:
+            label, urls = component_urls(component)
+            if urls:
+                for url in urls:
+                    if url not in self._futures:
+                        self._futures[url] = self._executor.submit(self._check, url)
+                self._components.append((label, urls))
+            yield component
+
+    def failures(self):
+        """
+        Дожидается проверок и возвращает список (компонент, url, код ответа, ошибка)
+        для недоступных ссылок в порядке компонентов.
+        """
+        started = time.perf_counter()
+        results = {url: future.result() for url, future in self._futures.items()}
+        self.wait_seconds += time.perf_counter() - started
+        failures = []
+        for label, urls in self._components:
+            for url in urls:
+                ok, status, error = results[url]
+                if not ok:
+                    failures.append((label, url, status, error))
+        return failures
+
+    def close(self, cancel=False):
+        self._executor.shutdown(wait=True, cancel_futures=cancel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close(cancel=exc_type is not None)
@@ -0,0 +1,12 @@
+# xlsx-to-json/util.py
+
+"""
+Общие функции для разбора значений ячеек, которые используют и чтение таблиц, и обработчики PURL.
+"""
+
+
+def is_missing(value):
+    """
+    Пустое значение ячейки (None или NaN) - замена pd.isna для значений из xlsx и CSV.
+    """
+    return value is None or value != value
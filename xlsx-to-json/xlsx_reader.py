@@ -0,0 +1,247 @@
+# xlsx-to-json/xlsx_reader.py
+
+"""
+Потоковое чтение xlsx: XML листа разбирается по мере обхода строк, и в памяти
+находится только текущая строка, а не вся таблица. Описание книги, стили и
+форматы дат читаются средствами openpyxl; листы разбираются здесь напрямую,
+потому что openpyxl в режиме read-only при открытии книги просматривает каждый
+лист целиком, если в нем нет элемента dimension (так пишет и json-to-xlsx).
+"""
+
+from xml.etree.ElementTree import iterparse
+
+# Модули openpyxl импортируются при открытии книги: преобразование CSV/TSV и запуск
+# без входного xlsx (--help) не тратят время на импорт openpyxl
+SHEET_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+# Коды ошибок Excel (openpyxl.cell.cell.ERROR_CODES)
+ERROR_CODES = ("#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A")
+
+_SHEET_DATA = f"{{{SHEET_MAIN_NS}}}sheetData"
+_ROW = f"{{{SHEET_MAIN_NS}}}row"
+_CELL = f"{{{SHEET_MAIN_NS}}}c"
+_VALUE = f"{{{SHEET_MAIN_NS}}}v"
+_INLINE = f"{{{SHEET_MAIN_NS}}}is"
+_TEXT = f"{{{SHEET_MAIN_NS}}}t"
+_RUN = f"{{{SHEET_MAIN_NS}}}r"
+_STRING_ITEM = f"{{{SHEET_MAIN_NS}}}si"
+_DIGITS = "0123456789"
+
+# Значения, которые pd.read_excel по умолчанию считает пустыми
+NA_VALUES = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]) | frozenset(ERROR_CODES)
+
+
+def _text(element):
+    """
+    Текст строки xlsx (элементы si и is): простой текст и фрагменты форматированного текста,
+    без фонетических подсказок.
+    """
+    parts = []
+    for child in element:
+        if child.tag == _TEXT:
+            parts.append(child.text or "")
+        elif child.tag == _RUN:
+            text = child.find(_TEXT)
+            if text is not None:
+                parts.append(text.text or "")
+    return "".join(parts)
+
+
+def _number(value):
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+class Workbook:
+    """
+    Открытая книга: список листов и общие для них таблица строк и форматы дат.
+    Архив остается открытым до close().
+    """
+
+    def __init__(self, file_path):
+        from openpyxl.reader.excel import ExcelReader
+        from openpyxl.styles.stylesheet import apply_stylesheet
+        from openpyxl.xml.constants import SHARED_STRINGS
+
+        reader = ExcelReader(file_path, read_only=True, data_only=True, keep_links=False)
+        self._archive = reader.archive
+        try:
+            reader.read_manifest()
+            reader.read_workbook()
+            apply_stylesheet(reader.archive, reader.wb)
+            strings = reader.package.find(SHARED_STRINGS)
+            self.shared_strings = self._read_strings(strings.PartName[1:]) if strings is not None else []
+            self.epoch = reader.wb.epoch
+            self.date_formats = reader.wb._date_formats
+            self.timedelta_formats = reader.wb._timedelta_formats
+            self.worksheets = [
+                Worksheet(self, sheet.name, rel.target)
+                for sheet, rel in reader.parser.find_sheets()
+                if rel.target in reader.valid_files and "chartsheet" not in rel.Type
+            ]
+        except Exception:
+            self._archive.close()
+            raise
+
+    @property
+    def sheetnames(self):
+        return [sheet.title for sheet in self.worksheets]
+
+    def __getitem__(self, name):
+        for sheet in self.worksheets:
+            if sheet.title == name:
+                return sheet
+        raise KeyError(name)
+
+    def _read_strings(self, path):
+        strings = []
+        with self._archive.open(path) as source:
+            for _, element in iterparse(source):
+                if element.tag == _STRING_ITEM:
+                    strings.append(_text(element).replace("x005F_", ""))
+                    element.clear()
+        return strings
+
+    def open(self, path):
+        return self._archive.open(path)
+
+    def close(self):
+        self._archive.close()
+
+
+class Worksheet:
+
+    def __init__(self, workbook, title, path):
+        self.workbook = workbook
+        self.title = title
+        self._path = path
+
+    def _cell_value(self, cell):
+        """
+        Значение ячейки как в openpyxl с data_only=True: для формул - сохраненный результат.
+        """
+        data_type = cell.get("t", "n")
+        if data_type == "inlineStr":
+            inline = cell.find(_INLINE)
+            return _text(inline) if inline is not None else None
+        value = cell.findtext(_VALUE) or None
+        if value is None:
+            return None
+        if data_type == "n":
+            value = _number(value)
+            style_id = int(cell.get("s", 0))
+            if style_id in self.workbook.date_formats:
+                from openpyxl.utils.datetime import from_excel
+                try:
+                    return from_excel(value, self.workbook.epoch, timedelta=style_id in self.workbook.timedelta_formats)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return value
+        if data_type == "s":
+            return self.workbook.shared_strings[int(value)]
+        if data_type == "b":
+            return bool(int(value))
+        if data_type == "d":
+            from openpyxl.utils.datetime import from_ISO8601
+            return from_ISO8601(value)
+        # "str" (результат формулы) и "e" (ошибка) - текст как есть
+        return value
+
+    def iter_rows(self, columns=None):
+        """
+        Выдает (номер строки, словарь {номер колонки с 0: значение}) для непустых строк листа.
+        Если задано множество columns, разбираются только эти колонки.
+        Разобранные строки сразу удаляются из дерева, поэтому память не растет с размером листа.
+        """
+        from openpyxl.utils.cell import column_index_from_string
+
+        sheet_data = None
+        row_number = 0
+        with self.workbook.open(self._path) as source:
+            for event, element in iterparse(source, events=("start", "end")):
+                if event == "start":
+                    if element.tag == _SHEET_DATA:
+                        sheet_data = element
+                    continue
+                if element.tag != _ROW:
+                    continue
+                number = element.get("r")
+                row_number = int(number) if number else row_number + 1
+                cells = {}
+                column = -1
+                for cell in element.iter(_CELL):
+                    reference = cell.get("r")
+                    column = column_index_from_string(reference.rstrip(_DIGITS)) - 1 if reference else column + 1
+                    if columns is None or column in columns:
+                        value = self._cell_value(cell)
+                        if value is not None:
+                            cells[column] = value
+                if sheet_data is not None:
+                    sheet_data.clear()
+                if cells:
+                    yield row_number, cells
+
+
+def open_workbook(file_path):
+    return Workbook(file_path)
+
+
+def select_sheets(workbook, names=None, all_sheets=False, headers=None):
+    """
+    Возвращает листы для чтения: перечисленные по имени, все или (по умолчанию) первый
+    вместе с идущими за ним листами с тем же заголовком. Такие листы-продолжения пишет
+    json-to-xlsx, когда строки не помещаются на один лист Excel (Sheet1, Sheet2, ...);
+    headers - заголовки листов по имени (read_header). Неизвестное имя листа - KeyError.
+    """
+    if names:
+        return [workbook[name] for name in names]
+    if all_sheets:
+        return list(workbook.worksheets)
+    sheets = workbook.worksheets[:1]
+    if headers and sheets:
+        first_header = headers[sheets[0].title][1]
+        for sheet in workbook.worksheets[1:]:
+            if headers[sheet.title][1] != first_header:
+                break
+            sheets.append(sheet)
+    return sheets
+
+
+def cell_value(value):
+    """
+    Значение ячейки как у pd.read_excel: целые числа без дробной части, пустые
+    и ошибочные ячейки, а также строки из NA_VALUES - None.
+    """
+    if value is None:
+        return None
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and value in NA_VALUES:
+        return None
+    return value
+
+
+def read_header(sheet):
+    """
+    Возвращает (номер строки, список заголовков): заголовок - первая непустая строка листа.
+    """
+    for row_number, cells in sheet.iter_rows():
+        return row_number, [cells.get(index) for index in range(max(cells) + 1)]
+    return 0, []
+
+
+def iter_sheet_rows(sheet, header_row, indexes):
+    """
+    Выдает (номер строки, кортеж значений колонок с номерами indexes) для строк после заголовка.
+    Строки, в которых все эти колонки пусты, пропускаются.
+    """
+    columns = set(indexes)
+    for row_number, cells in sheet.iter_rows(columns):
+        if row_number <= header_row:
+            continue
+        values = tuple(cell_value(cells.get(index)) for index in indexes)
+        if any(value is not None for value in values):
+            yield row_number, values